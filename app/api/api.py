@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 
 from app.api.routes import documents, collections, chat, conversations, tags, migration
+from app.utils.orjson_response import ORJSONResponse
 
-api_router = APIRouter()
+api_router = APIRouter(default_response_class=ORJSONResponse)
 
 # Include routers for different API endpoints
 api_router.include_router(documents.router, prefix="/documents", tags=["documents"])
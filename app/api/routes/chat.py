@@ -1,14 +1,230 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends
 from typing import List, Dict, Any, Optional
-import json
+import asyncio
+import orjson
+from pydantic import TypeAdapter
 
 from app.models.schemas import ChatRequest, ChatResponse, ChatMessage, ConversationCreate, ConversationUpdate
 from app.db.chroma_client import chroma_client
 from app.db.conversation_store import conversation_store
 from app.services.llm_service import llm_service, StreamingCallbackHandler
 from app.api.routes.conversations import generate_title_from_messages
+from app.utils.orjson_response import ORJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Validates a whole chat history in a single pass
+_HistoryAdapter = TypeAdapter(List[ChatMessage])
+
+# Constant frames encoded once at import
+_START_FRAME = orjson.dumps({"type": "start", "content": "Generating response..."}).decode()
+_PONG_FRAME = orjson.dumps({"type": "pong", "content": "pong"}).decode()
+_MISSING_QUERY_FRAME = orjson.dumps({"type": "error", "content": "Missing required field: query"}).decode()
+_INVALID_JSON_FRAME = orjson.dumps({"type": "error", "content": "Invalid JSON message"}).decode()
+
+# Ping frames as serialized by JSON.stringify and json.dumps, answered without parsing
+_PING_FRAMES = frozenset(('{"type":"ping"}', '{"type": "ping"}'))
+
+# Frames buffered per connection before generation waits for a slow client
+_SEND_QUEUE_MAX_FRAMES = 256
+
+
+class _QueuedSender:
+    """Send side of a WebSocket connection that hands frames to its writer task."""
+    
+    def __init__(self, queue: asyncio.Queue, writer: asyncio.Task):
+        """Initialize with the connection's outgoing frame queue.
+        
+        Args:
+            queue: Bounded queue drained by the connection's writer task
+            writer: The connection's writer task
+        """
+        self._queue = queue
+        self._writer = writer
+    
+    async def send_text(self, data: str) -> None:
+        """Queue a text frame, waiting only while the queue is full.
+        
+        Args:
+            data: Encoded frame
+            
+        Raises:
+            WebSocketDisconnect: If the writer has stopped, i.e. the client is gone
+        """
+        if self._writer.done():
+            raise WebSocketDisconnect()
+        if not self._queue.full():
+            self._queue.put_nowait(data)
+            return
+        
+        # Wait for the client to catch up, unless the writer stops in the meantime
+        put = asyncio.ensure_future(self._queue.put(data))
+        await asyncio.wait({put, self._writer}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            raise WebSocketDisconnect()
+
+
+async def _writer(websocket: WebSocket, queue: asyncio.Queue) -> None:
+    """Send queued frames to the client in order.
+    
+    Args:
+        websocket: WebSocket connection
+        queue: Queue of encoded frames
+    """
+    while True:
+        await websocket.send_text(await queue.get())
+
+
+async def _send_json(sender: _QueuedSender, payload: Dict[str, Any]) -> None:
+    """Send a JSON text frame encoded with orjson.
+    
+    Args:
+        sender: Send side of the WebSocket connection
+        payload: Message to send
+    """
+    await sender.send_text(orjson.dumps(payload).decode())
+
+
+async def _handle_chat(sender: _QueuedSender, message: Dict[str, Any]) -> None:
+    """Handle a chat message by streaming a RAG response.
+    
+    Args:
+        sender: Send side of the WebSocket connection
+        message: Parsed chat message
+    """
+    # Extract chat request
+    collection_name = message.get("collection_name")  # Deprecated
+    query = message.get("query")
+    history_data = message.get("history", [])
+    model = message.get("model")
+    conversation_id = message.get("conversation_id")
+    tags = message.get("tags")
+    include_untagged = message.get("include_untagged", True)
+    
+    # Validate required fields
+    if not query:
+        await sender.send_text(_MISSING_QUERY_FRAME)
+        return
+    
+    # Initialize history
+    history = None
+    history_from_store = False
+    
+    # If conversation_id is provided, load the existing conversation's messages
+    if conversation_id:
+        stored_messages = conversation_store.get_messages(conversation_id)
+        if stored_messages is None:
+            await _send_json(sender, {
+                "type": "error",
+                "content": f"Conversation {conversation_id} not found"
+            })
+            return
+        # Use the conversation's history if no history is provided
+        if not history_data:
+            history = stored_messages
+            history_from_store = True
+    
+    # If no history from conversation, use provided history
+    if not history:
+        # Convert history data to ChatMessage objects, reading each field once
+        history = _HistoryAdapter.validate_python([
+            {"role": role, "content": content}
+            for msg in history_data
+            if (role := msg.get("role")) and (content := msg.get("content"))
+        ]) if history_data else None
+    
+    # Create streaming callback handler
+    callback_handler = StreamingCallbackHandler(sender)
+    
+    # Send start message
+    await sender.send_text(_START_FRAME)
+    
+    # Generate RAG response with streaming (tag-based)
+    response_data = await llm_service.generate_rag_response_by_tags(
+        query=query,
+        tags=tags,
+        include_untagged=include_untagged,
+        history=history,
+        model=model,
+        streaming=True,
+        callback_handler=callback_handler
+    )
+    
+    # Save or update the conversation
+    updated_history = response_data["history"]
+    
+    if history_from_store:
+        # Only the latest exchange is new when the history came from the store
+        conversation_store.append_messages(conversation_id, updated_history[-2:])
+    elif conversation_id:
+        # Update existing conversation
+        conversation_store.update_conversation(
+            conversation_id,
+            update=ConversationUpdate(messages=updated_history)
+        )
+    else:
+        # Create a new conversation
+        new_conversation = ConversationCreate(
+            collection_name=None,  # Deprecated
+            model=model,
+            messages=updated_history,
+            tags=tags,
+            include_untagged=include_untagged
+        )
+    
+        # Generate a title for the new conversation
+        if len(updated_history) >= 2:  # At least one exchange (user + assistant)
+            title = await generate_title_from_messages(updated_history, model)
+            new_conversation.title = title
+    
+        # Save the new conversation
+        saved_conversation = conversation_store.create_conversation(new_conversation)
+        conversation_id = saved_conversation.id
+    
+    # Send complete response
+    await _send_json(sender, {
+        "type": "complete",
+        "content": {
+            "answer": response_data["answer"],
+            "sources": response_data["sources"],
+            "history": [
+                {"role": msg.role, "content": msg.content}
+                for msg in response_data["history"]
+            ],
+            "conversation_id": conversation_id
+        }
+    })
+
+
+async def _handle_ping(sender: _QueuedSender, message: Dict[str, Any]) -> None:
+    """Respond to a ping message.
+    
+    Args:
+        sender: Send side of the WebSocket connection
+        message: Parsed ping message
+    """
+    await sender.send_text(_PONG_FRAME)
+
+
+async def _handle_unknown(sender: _QueuedSender, message: Dict[str, Any]) -> None:
+    """Report an unknown message type.
+    
+    Args:
+        sender: Send side of the WebSocket connection
+        message: Parsed message
+    """
+    await _send_json(sender, {
+        "type": "error",
+        "content": f"Unknown message type: {message.get('type')}"
+    })
+
+
+# WebSocket message handlers by message type
+_HANDLERS = {
+    "chat": _handle_chat,
+    "ping": _handle_ping
+}
 
 
 @router.websocket("/ws")
@@ -20,145 +236,40 @@ async def websocket_endpoint(websocket: WebSocket):
     """
     await websocket.accept()
     
+    # Frames are written by a dedicated task so a slow client only blocks generation once the queue is full
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_SEND_QUEUE_MAX_FRAMES)
+    writer = asyncio.create_task(_writer(websocket, queue))
+    sender = _QueuedSender(queue, writer)
+    
     try:
         while True:
             # Receive message from client
             data = await websocket.receive_text()
             
+            # Fast path for keepalive pings
+            if data in _PING_FRAMES:
+                await sender.send_text(_PONG_FRAME)
+                continue
+            
             try:
                 # Parse message
-                message = json.loads(data)
+                message = orjson.loads(data)
                 
-                # Check message type
-                if message.get("type") == "chat":
-                    # Extract chat request
-                    collection_name = message.get("collection_name")  # Deprecated
-                    query = message.get("query")
-                    history_data = message.get("history", [])
-                    model = message.get("model")
-                    conversation_id = message.get("conversation_id")
-                    tags = message.get("tags")
-                    include_untagged = message.get("include_untagged", True)
-                    
-                    # Validate required fields
-                    if not query:
-                        await websocket.send_json({
-                            "type": "error",
-                            "content": "Missing required field: query"
-                        })
-                        continue
-                    
-                    # Initialize history
-                    history = None
-                    
-                    # If conversation_id is provided, load the existing conversation
-                    if conversation_id:
-                        conversation = conversation_store.get_conversation(conversation_id)
-                        if not conversation:
-                            await websocket.send_json({
-                                "type": "error",
-                                "content": f"Conversation {conversation_id} not found"
-                            })
-                            continue
-                        # Use the conversation's history if no history is provided
-                        if not history_data:
-                            history = conversation.messages
-                    
-                    # If no history from conversation, use provided history
-                    if not history:
-                        # Convert history data to ChatMessage objects
-                        history = [
-                            ChatMessage(role=msg.get("role"), content=msg.get("content"))
-                            for msg in history_data
-                            if msg.get("role") and msg.get("content")
-                        ] if history_data else None
-                    
-                    # Create streaming callback handler
-                    callback_handler = StreamingCallbackHandler(websocket)
-                    
-                    # Send start message
-                    await websocket.send_json({
-                        "type": "start",
-                        "content": "Generating response..."
-                    })
-                    
-                    # Generate RAG response with streaming (tag-based)
-                    response_data = await llm_service.generate_rag_response_by_tags(
-                        query=query,
-                        tags=tags,
-                        include_untagged=include_untagged,
-                        history=history,
-                        model=model,
-                        streaming=True,
-                        callback_handler=callback_handler
-                    )
-                    
-                    # Save or update the conversation
-                    updated_history = response_data["history"]
-                    
-                    if conversation_id:
-                        # Update existing conversation
-                        conversation_store.update_conversation(
-                            conversation_id,
-                            update=ConversationUpdate(messages=updated_history)
-                        )
-                    else:
-                        # Create a new conversation
-                        new_conversation = ConversationCreate(
-                            collection_name=None,  # Deprecated
-                            model=model,
-                            messages=updated_history,
-                            tags=tags,
-                            include_untagged=include_untagged
-                        )
-                        
-                        # Generate a title for the new conversation
-                        if len(updated_history) >= 2:  # At least one exchange (user + assistant)
-                            title = await generate_title_from_messages(updated_history, model)
-                            new_conversation.title = title
-                        
-                        # Save the new conversation
-                        saved_conversation = conversation_store.create_conversation(new_conversation)
-                        conversation_id = saved_conversation.id
-                    
-                    # Send complete response
-                    await websocket.send_json({
-                        "type": "complete",
-                        "content": {
-                            "answer": response_data["answer"],
-                            "sources": response_data["sources"],
-                            "history": [
-                                {"role": msg.role, "content": msg.content}
-                                for msg in response_data["history"]
-                            ],
-                            "conversation_id": conversation_id
-                        }
-                    })
-                
-                elif message.get("type") == "ping":
-                    # Respond to ping
-                    await websocket.send_json({
-                        "type": "pong",
-                        "content": "pong"
-                    })
-                
-                else:
-                    # Unknown message type
-                    await websocket.send_json({
-                        "type": "error",
-                        "content": f"Unknown message type: {message.get('type')}"
-                    })
+                # Dispatch on message type
+                handler = _HANDLERS.get(message.get("type"), _handle_unknown)
+                await handler(sender, message)
             
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 # Invalid JSON
-                await websocket.send_json({
-                    "type": "error",
-                    "content": "Invalid JSON message"
-                })
+                await sender.send_text(_INVALID_JSON_FRAME)
+            
+            except WebSocketDisconnect:
+                # The writer stopped mid-response; stop generating instead of reporting an error
+                raise
             
             except Exception as e:
                 # Other errors
-                await websocket.send_json({
+                await _send_json(sender, {
                     "type": "error",
                     "content": f"Error processing message: {str(e)}"
                 })
@@ -166,6 +277,14 @@ async def websocket_endpoint(websocket: WebSocket):
     except WebSocketDisconnect:
         # Client disconnected
         pass
+    
+    finally:
+        writer.cancel()
+        try:
+            await writer
+        except (asyncio.CancelledError, Exception):
+            # A failed send only means the client is gone
+            pass
 
 
 @router.post("/", response_model=ChatResponse)
@@ -185,19 +304,21 @@ async def chat(request: ChatRequest):
         
         # Initialize history
         history = request.history or []
+        history_from_store = False
         conversation_id = request.conversation_id
         
-        # If conversation_id is provided, load the existing conversation
+        # If conversation_id is provided, load the existing conversation's messages
         if conversation_id:
-            conversation = conversation_store.get_conversation(conversation_id)
-            if not conversation:
+            stored_messages = conversation_store.get_messages(conversation_id)
+            if stored_messages is None:
                 raise HTTPException(
                     status_code=404,
                     detail=f"Conversation {conversation_id} not found"
                 )
             # Use the conversation's history if no history is provided
             if not request.history:
-                history = conversation.messages
+                history = stored_messages
+                history_from_store = True
         
         # Generate RAG response using tags
         response_data = await llm_service.generate_rag_response_by_tags(
@@ -211,15 +332,18 @@ async def chat(request: ChatRequest):
         # Save or update the conversation
         updated_history = response_data["history"]
         
-        if conversation_id:
+        if history_from_store:
+            # Only the latest exchange is new when the history came from the store
+            conversation_store.append_messages(conversation_id, updated_history[-2:])
+        elif conversation_id:
             # Update existing conversation
             conversation_store.update_conversation(
                 conversation_id,
-                update=ConversationUpdate(messages=updated_history)
+                update=ConversationUpdate.model_construct(messages=updated_history)
             )
         else:
-            # Create a new conversation
-            new_conversation = ConversationCreate(
+            # Create a new conversation (fields come from the already validated request)
+            new_conversation = ConversationCreate.model_construct(
                 collection_name=None,  # Deprecated
                 model=request.model,
                 messages=updated_history,
@@ -236,12 +360,16 @@ async def chat(request: ChatRequest):
             saved_conversation = conversation_store.create_conversation(new_conversation)
             conversation_id = saved_conversation.id
         
-        return ChatResponse(
-            answer=response_data["answer"],
-            sources=response_data["sources"],
-            history=response_data["history"],
-            conversation_id=conversation_id
-        )
+        # Return the response directly to skip response_model validation and jsonable_encoder
+        return ORJSONResponse({
+            "answer": response_data["answer"],
+            "sources": response_data["sources"],
+            "history": [
+                {"role": msg.role, "content": msg.content}
+                for msg in response_data["history"]
+            ],
+            "conversation_id": conversation_id
+        })
     
     except HTTPException:
         raise
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List
+import asyncio
 
 from app.models.schemas import CollectionCreate, CollectionResponse, CollectionList
 from app.db.chroma_client import chroma_client
+from app.db.collection_cache import collection_cache
+from app.utils.orjson_response import ORJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 @router.post("/", response_model=CollectionResponse, status_code=201)
@@ -19,15 +22,14 @@ async def create_collection(collection: CollectionCreate):
     """
     try:
         # Check if collection already exists
-        existing_collections = chroma_client.list_collections()
-        if collection.name in existing_collections:
+        if await collection_cache.exists_async(collection.name):
             raise HTTPException(
                 status_code=400,
                 detail=f"Collection '{collection.name}' already exists"
             )
         
         # Create the collection
-        chroma_client.get_or_create_collection(collection.name)
+        await asyncio.to_thread(chroma_client.get_or_create_collection, collection.name)
         
         return CollectionResponse(
             name=collection.name,
@@ -48,8 +50,7 @@ async def list_collections():
         List of collection names
     """
     try:
-        collections = chroma_client.list_collections()
-        return CollectionList(collections=collections)
+        return CollectionList(collections=sorted(await collection_cache.snapshot_async()))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -69,8 +70,7 @@ async def get_collection(collection_name: str):
     """
     try:
         # Check if collection exists
-        collections = chroma_client.list_collections()
-        if collection_name not in collections:
+        if not await collection_cache.exists_async(collection_name):
             raise HTTPException(
                 status_code=404,
                 detail=f"Collection '{collection_name}' not found"
@@ -99,15 +99,14 @@ async def delete_collection(collection_name: str):
     """
     try:
         # Check if collection exists
-        collections = chroma_client.list_collections()
-        if collection_name not in collections:
+        if not await collection_cache.exists_async(collection_name):
             raise HTTPException(
                 status_code=404,
                 detail=f"Collection '{collection_name}' not found"
             )
         
         # Delete the collection
-        chroma_client.delete_collection(collection_name)
+        await asyncio.to_thread(chroma_client.delete_collection, collection_name)
         
         return None
     except HTTPException:
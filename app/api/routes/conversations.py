@@ -1,5 +1,8 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Any, Optional
+import hashlib
+
+from cachetools import TTLCache
 
 from app.models.schemas import (
     ConversationCreate, 
@@ -10,10 +13,27 @@ from app.models.schemas import (
     TitleGenerationResponse,
     ChatMessage
 )
+from app.core.config import settings
 from app.db.conversation_store import conversation_store
 from app.services.llm_service import llm_service
+from app.utils.orjson_response import ORJSONResponse
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Prompt for title generation, filled with the (truncated) first user message
+_TITLE_TEMPLATE = """Generate a short sentence title (3-6 words maximum) for a conversation that starts with this message:
+
+User message: "{first_message}"
+
+The title should be a natural, conversational sentence that captures what the user wants to know or do. Use sentence case and avoid quotation marks. Examples:
+- "How do I set up my development environment"
+- "What are the best practices for testing"
+- "Help me troubleshoot this error message"
+
+Respond with just the title sentence, nothing else."""
 
-router = APIRouter()
+# Generated titles keyed by a hash of the model and first user message
+_title_cache = TTLCache(maxsize=settings.TITLE_CACHE_MAX_ENTRIES, ttl=settings.TITLE_CACHE_TTL_SECONDS)
 
 
 @router.post("/", response_model=ConversationResponse)
@@ -51,7 +71,7 @@ async def get_conversation(conversation_id: str):
     if not conversation:
         raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
     
-    return conversation
+    return ORJSONResponse(conversation.model_dump())
 
 
 @router.put("/{conversation_id}", response_model=ConversationResponse)
@@ -104,10 +124,10 @@ async def list_conversations(
         List of conversations
     """
     result = conversation_store.list_conversations(skip=skip, limit=limit)
-    return ConversationList(
-        conversations=result["conversations"],
-        total=result["total"]
-    )
+    return ORJSONResponse({
+        "conversations": [conversation.model_dump() for conversation in result["conversations"]],
+        "total": result["total"]
+    })
 
 
 @router.post("/generate-title", response_model=TitleGenerationResponse)
@@ -135,27 +155,22 @@ async def generate_title_from_messages(messages: List[ChatMessage], model: Optio
         Generated title
     """
     # Extract the first user message
-    user_messages = [msg for msg in messages if msg.role == "user"]
-    if not user_messages:
+    first_message = next((msg.content for msg in messages if msg.role == "user"), None)
+    if first_message is None:
         return "New conversation"
     
-    first_message = user_messages[0].content
-    
     # Truncate the message if it's too long
     if len(first_message) > 100:
         first_message = first_message[:100] + "..."
     
+    # Reuse the title generated earlier for the same opener and model
+    cache_key = hashlib.blake2b(f"{model}\0{first_message}".encode(), digest_size=16).hexdigest()
+    cached_title = _title_cache.get(cache_key)
+    if cached_title is not None:
+        return cached_title
+    
     # Create a prompt for title generation
-    prompt = f"""Generate a short sentence title (3-6 words maximum) for a conversation that starts with this message:
-
-User message: "{first_message}"
-
-The title should be a natural, conversational sentence that captures what the user wants to know or do. Use sentence case and avoid quotation marks. Examples:
-- "How do I set up my development environment"
-- "What are the best practices for testing"
-- "Help me troubleshoot this error message"
-
-Respond with just the title sentence, nothing else."""
+    prompt = _TITLE_TEMPLATE.format(first_message=first_message)
     
     try:
         # Get LLM
@@ -172,6 +187,7 @@ Respond with just the title sentence, nothing else."""
         # Remove quotes if present
         title = title.strip('"\'')
         
+        _title_cache[cache_key] = title
         return title
     except Exception as e:
         # If title generation fails, use a default title based on the first message
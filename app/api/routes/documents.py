@@ -1,11 +1,24 @@
 import os
+import re
+import asyncio
+import hashlib
+import heapq
+import threading
 import traceback
+from contextlib import asynccontextmanager
+from functools import partial
+from pathlib import Path
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Query
-from typing import List, Optional, Dict, Any
-import json
+from fastapi import APIRouter, BackgroundTasks, HTTPException, UploadFile, File, Form, Depends, Query, Request, Response
+from typing import List, Optional, Dict, Any, Tuple, Callable, Awaitable, AsyncIterator, FrozenSet, Iterable, Sequence
+
+import numpy as np
+import orjson
+from cachetools import TTLCache
+from fastapi.responses import StreamingResponse
 
 from app.models.schemas import (
+    DocumentMetadata,
     DocumentResponse, 
     DocumentList, 
     TextInput,
@@ -13,33 +26,409 @@ from app.models.schemas import (
     QueryResponse,
     QueryResult,
     DeleteDocumentRequest,
-    UpdateDocumentTagsRequest
+    UpdateDocumentTagsRequest,
+    IngestJobResponse
 )
-from app.db.chroma_client import chroma_client
-from app.utils.document_processor import document_processor
+from app.db.chroma_client import chroma_client, CollectionNotFoundError
+from app.db.collection_cache import collection_cache
+from app.utils.document_processor import document_processor, run_with_timeout, FileTooLargeError
 from app.services.llm_service import llm_service
+from app.services.write_batcher import write_batcher
+from app.services.ingest_jobs import ingest_jobs
 from app.core.config import settings
+from app.utils.orjson_response import ORJSONResponse
+from app.utils.tags import parse_tags, parse_tag_set, join_tags
+from app.utils.metadata import INTERNAL_META_KEYS, public_metadata
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Metadata keys returned as dedicated fields rather than in additional_metadata
+_RESERVED_META_KEYS = frozenset({"source", "chunk", "total_chunks", "page", "tags"}) | INTERNAL_META_KEYS
+
+# Metadata keys left out of the per-source metadata in document listings
+_SOURCE_META_KEYS = frozenset({"source", "chunk", "total_chunks", "tags"}) | INTERNAL_META_KEYS
+
+# Sources that look like temp file paths: absolute and mentioning "tmp" in any case
+_TEMP_PATH_RE = re.compile(r"/.*tmp", re.IGNORECASE | re.DOTALL)
+
+# Largest accepted upload in bytes
+_MAX_UPLOAD_BYTES = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+
+# Largest text upload processed without a temporary file, in bytes
+_INLINE_UPLOAD_MAX_BYTES = int(settings.INLINE_UPLOAD_MAX_MB * 1024 * 1024)
+
+# Documents processed and stored at once; further requests wait for a slot
+_ingest_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_INGESTS)
+_ingest_waiting = 0
+
+# Seconds clients are asked to wait before retrying a rejected ingest
+_INGEST_RETRY_AFTER_SECONDS = 5
+
+# Approximate size of each chunk of a streamed document listing
+_STREAM_CHUNK_BYTES = 64 * 1024
+
+# Characters of matched chunk text shown in content search previews
+_PREVIEW_CHARS = 200
+
+# Maximum number of collections scanned at once by the all-collections listing
+_COLLECTION_SCAN_CONCURRENCY = 8
+
+# Query responses by normalized query and filters, cleared whenever documents change
+_query_cache = TTLCache(maxsize=settings.QUERY_CACHE_MAX_ENTRIES, ttl=settings.QUERY_CACHE_TTL_SECONDS)
+_query_cache_generation = 0
+_query_cache_lock = threading.Lock()
+
+# (ETag, response) by collection and document ID, cleared whenever documents change.
+# The generation is bumped on every clear so a response read before a write is not cached after it
+_document_cache = TTLCache(maxsize=settings.DOCUMENT_CACHE_MAX_ENTRIES, ttl=settings.DOCUMENT_CACHE_TTL_SECONDS)
+_document_cache_generation = 0
+_document_cache_lock = threading.Lock()
+
+# (ETag, listing) by collection and limit, cleared together with the document cache and
+# guarded by the same generation
+_listing_cache = TTLCache(maxsize=settings.DOCUMENT_CACHE_MAX_ENTRIES, ttl=settings.DOCUMENT_CACHE_TTL_SECONDS)
+
+# Per-source summary of the main collection used by filename search, rebuilt after documents change.
+# The generation is bumped on every change so an index built concurrently with a write is not kept
+_search_index: Optional[List[Dict[str, Any]]] = None
+_search_index_generation = 0
+_search_index_lock = threading.Lock()
+
+
+def _clear_query_cache() -> None:
+    """Drop all cached query responses."""
+    global _query_cache_generation
+    with _query_cache_lock:
+        _query_cache.clear()
+        _query_cache_generation += 1
+
+
+def _clear_document_cache() -> None:
+    """Drop all cached document responses and listings."""
+    global _document_cache_generation
+    with _document_cache_lock:
+        _document_cache.clear()
+        _listing_cache.clear()
+        _document_cache_generation += 1
+
+
+def _clear_search_index() -> None:
+    """Drop the filename search index."""
+    global _search_index, _search_index_generation
+    with _search_index_lock:
+        _search_index = None
+        _search_index_generation += 1
+
+
+def _build_search_index(metadatas: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Summarize chunk metadata by source for filename search.
+    
+    Chunks of a source are grouped by their tag string, keeping the first
+    chunk's metadata and the chunk count of each group, so tag filters can
+    be applied per group without rescanning the chunks.
+    
+    Args:
+        metadatas: Chunk metadata of the main collection
+        
+    Returns:
+        Index entries with the source, its lowercased form and its tag groups
+    """
+    index = {}
+    for metadata in metadatas:
+        source = metadata.get("source", "unknown")
+        entry = index.get(source)
+        if entry is None:
+            entry = index[source] = {"source": source, "source_lower": source.lower(), "tag_groups": {}}
+        
+        tags = metadata.get("tags", "")
+        group = entry["tag_groups"].get(tags)
+        if group is None:
+            entry["tag_groups"][tags] = [metadata, 1]
+        else:
+            group[1] += 1
+    return list(index.values())
+
+
+async def _get_search_index() -> List[Dict[str, Any]]:
+    """Get the filename search index, building it from the main collection if needed.
+    
+    Returns:
+        Index entries in the order their sources were first stored
+    """
+    global _search_index
+    
+    with _search_index_lock:
+        index, generation = _search_index, _search_index_generation
+    if index is not None:
+        return index
+    
+    # Filename matching and chunk counts need no chunk text
+    all_docs = await asyncio.to_thread(
+        chroma_client.get_collection_documents,
+        chroma_client.DOCUMENTS_COLLECTION,
+        limit=None,
+        include=["metadatas"]
+    )
+    if not all_docs or not all_docs.get("ids"):
+        index = []
+    else:
+        index = _build_search_index(all_docs.get("metadatas") or [{}] * len(all_docs["ids"]))
+    
+    with _search_index_lock:
+        if _search_index_generation == generation:
+            _search_index = index
+    return index
+
+
+def _strip_reserved(metadata: Dict[str, Any], reserved: FrozenSet[str] = _RESERVED_META_KEYS) -> Dict[str, Any]:
+    """Copy chunk metadata without the keys returned as dedicated fields.
+    
+    Args:
+        metadata: Chunk metadata from ChromaDB
+        reserved: Keys to leave out
+        
+    Returns:
+        Remaining metadata
+    """
+    return {k: v for k, v in metadata.items() if k not in reserved}
+
+
+class _SourceSummary:
+    """Chunks of one source gathered while listing a collection."""
+    
+    __slots__ = ("source", "chunk_count", "total_chunks", "tags", "metadata")
+    
+    def __init__(self, source: str, total_chunks: Any, tags: Sequence[str], metadata: Dict[str, Any]):
+        """Initialize the summary from the source's first chunk.
+        
+        Args:
+            source: Cleaned-up source name
+            total_chunks: Total chunk count recorded in the chunk metadata
+            tags: Tags of the source
+            metadata: Remaining chunk metadata
+        """
+        self.source = source
+        self.chunk_count = 1
+        self.total_chunks = total_chunks
+        self.tags = tags
+        self.metadata = metadata
+
+
+def _document_row(source_info: Dict[str, Any], text: str) -> Dict[str, Any]:
+    """Build a DocumentResponse-shaped dict for a document grouped by source.
+    
+    Args:
+        source_info: Grouped source data with id, source, total_chunks, tags and metadata
+        text: Summary text for the document
+        
+    Returns:
+        Row matching the serialized DocumentResponse
+    """
+    return {
+        "id": source_info["id"],
+        "text": text,
+        "metadata": {
+            "source": source_info["source"],
+            "chunk": None,
+            "total_chunks": source_info["total_chunks"],
+            "page": None,
+            "tags": source_info["tags"],
+            "additional_metadata": source_info["metadata"]
+        }
+    }
+
+
+async def _stream_document_list(rows: Iterable[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode document rows as a DocumentList JSON body, piece by piece.
+    
+    Rows are encoded one at a time and sent in chunks of about
+    _STREAM_CHUNK_BYTES, so the full response is never held in memory.
+    
+    Args:
+        rows: DocumentResponse-shaped dicts
+        
+    Yields:
+        Parts of the JSON body
+    """
+    buffer = bytearray(b'{"documents":[')
+    total = 0
+    for row in rows:
+        if total:
+            buffer += b","
+        buffer += orjson.dumps(row)
+        total += 1
+        if len(buffer) >= _STREAM_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b'],"total":%d}' % total
+    yield bytes(buffer)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches an ETag.
+    
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+        
+    Returns:
+        True if the client already has the current representation
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+async def _add_to_main_collection(texts: List[str], metadatas: List[Dict[str, Any]], ids: List[str]) -> None:
+    """Add processed chunks to the main collection without blocking the event loop.
+    
+    Args:
+        texts: Chunk texts
+        metadatas: Chunk metadata dictionaries
+        ids: Chunk IDs
+    """
+    if settings.WRITE_BATCHING_ENABLED:
+        await write_batcher.add_documents(texts, metadatas, ids)
+    else:
+        await asyncio.to_thread(
+            chroma_client.add_document_to_main_collection,
+            documents=texts,
+            metadatas=metadatas,
+            ids=ids
+        )
+
+
+@asynccontextmanager
+async def _ingest_slot(reject_when_busy: bool = True) -> AsyncIterator[None]:
+    """Hold one of the limited ingestion slots while processing a document.
+    
+    Args:
+        reject_when_busy: Fail with a 503 instead of waiting when too many
+            requests are already waiting for a slot
+    """
+    global _ingest_waiting
+    if reject_when_busy and _ingest_semaphore.locked() and _ingest_waiting >= settings.MAX_WAITING_INGESTS:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many documents are being processed, please try again shortly",
+            headers={"Retry-After": str(_INGEST_RETRY_AFTER_SECONDS)}
+        )
+    
+    _ingest_waiting += 1
+    try:
+        await _ingest_semaphore.acquire()
+    finally:
+        _ingest_waiting -= 1
+    try:
+        yield
+    finally:
+        _ingest_semaphore.release()
+
+
+async def _save_upload(file: UploadFile, hasher: Any = None) -> str:
+    """Stream an upload to a temporary file in a worker thread, stopping past the size limit.
+    
+    Args:
+        file: Uploaded file
+        hasher: Optional hashlib object updated with the content as it is copied
+        
+    Returns:
+        Path to the saved file
+    """
+    try:
+        return await asyncio.to_thread(
+            document_processor.save_uploaded_file, file.file, file.filename, _MAX_UPLOAD_BYTES, hasher
+        )
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+async def _find_duplicate_upload(hasher: Any, filename: str, metadata: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+    """Finish an upload's hash and look for an identical upload already stored.
+    
+    The hash covers the file content together with the filename and the
+    metadata stored with it, so re-uploads with other tags are still processed.
+    
+    Args:
+        hasher: hashlib object fed with the file content
+        filename: Original filename
+        metadata: Metadata added to every chunk of the upload
+        
+    Returns:
+        Tuple of (upload hash, chunk count of the stored upload or None if there is none)
+    """
+    upload_hash = hashlib.blake2b(
+        hasher.digest() + orjson.dumps([filename, metadata], option=orjson.OPT_SORT_KEYS),
+        digest_size=16
+    ).hexdigest()
+    existing = await asyncio.to_thread(chroma_client.get_upload_by_hash, upload_hash)
+    if existing is None:
+        return upload_hash, None
+    return upload_hash, existing.get("total_chunks", 1)
+
+
+async def _run_ingest_job(
+    job_id: str,
+    process: Callable[[], Awaitable[Tuple[List[str], List[Dict[str, Any]], List[str]]]],
+    temp_file_path: Optional[str] = None
+) -> None:
+    """Process and store a queued document, recording the outcome on its job.
+    
+    Args:
+        job_id: Ingestion job ID
+        process: Produces the document's (chunks, metadatas, ids)
+        temp_file_path: Optional temporary file removed once the job ends
+    """
+    try:
+        # Queued jobs wait for a slot rather than being rejected
+        async with _ingest_slot(reject_when_busy=False):
+            ingest_jobs.update(job_id, status="processing")
+            texts, metadatas, ids = await process()
+            
+            # Check if any chunks were generated
+            if not texts or not ids:
+                raise ValueError(f"Failed to extract content. Expected IDs to be a non-empty list, got {ids}")
+            
+            await _add_to_main_collection(texts, metadatas, ids)
+        ingest_jobs.update(job_id, status="completed", chunks=len(ids))
+    except Exception as e:
+        print(f"Ingestion job {job_id} failed: {e}")
+        ingest_jobs.update(job_id, status="failed", error=str(e))
+    finally:
+        if temp_file_path:
+            Path(temp_file_path).unlink(missing_ok=True)
 
-router = APIRouter()
+
+chroma_client.document_listeners.append(_clear_query_cache)
+chroma_client.document_listeners.append(_clear_document_cache)
+chroma_client.document_listeners.append(_clear_search_index)
 
 
 @router.post("/upload", status_code=201)
 async def upload_document(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     collection_name: Optional[str] = Form(None),  # Deprecated but kept for compatibility
     tags: Optional[str] = Form(None),
-    additional_metadata: Optional[str] = Form(None)
+    additional_metadata: Optional[str] = Form(None),
+    background: bool = Query(False, description="Queue the document and return 202 with a job ID")
 ):
     """Upload a document to the vector database.
     
+    With background=true the document is processed after the response is
+    sent; poll GET /jobs/{job_id} for the outcome.
+    
     Args:
+        background_tasks: Tasks run after the response is sent
         file: Document file
         collection_name: Name of the collection to add the document to
         tags: Optional comma-separated list of tags (e.g., "personal,house,important")
         additional_metadata: Optional JSON string with additional metadata
+        background: Whether to process the document in the background
         
     Returns:
-        Upload status
+        Upload status, or the queued job when processing in the background
     """
     try:
         # In the new system, all documents go to the main collection
@@ -49,17 +438,20 @@ async def upload_document(
         metadata_dict = {}
         if additional_metadata:
             try:
-                metadata_dict = json.loads(additional_metadata)
-            except json.JSONDecodeError:
+                metadata_dict = orjson.loads(additional_metadata)
+            except orjson.JSONDecodeError:
                 raise HTTPException(
                     status_code=400,
                     detail="Invalid JSON in additional_metadata"
                 )
         
-        # Parse tags if provided
-        tag_list = None
-        if tags:
-            tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
+        # Parse tags if provided, stripping each tag once and dropping empty ones
+        tag_list = list(filter(None, map(str.strip, tags.split(',')))) if tags else None
+        
+        # Metadata added to every chunk while it is built
+        if tag_list:
+            # Convert tag list to comma-separated string to ensure compatibility with ChromaDB
+            metadata_dict["tags"] = join_tags(tag_list)
         
         # Check file size before reading (FastAPI provides size in bytes)
         if hasattr(file, 'size') and file.size:
@@ -70,53 +462,107 @@ async def upload_document(
                     detail=f"File '{file.filename}' is {file_size_mb:.1f}MB, which exceeds the maximum allowed size of {settings.MAX_FILE_SIZE_MB}MB."
                 )
         
-        # Read file content
-        file_content = await file.read()
+        # Hash the content while it is read, so identical re-uploads can be skipped
+        hasher = hashlib.blake2b(digest_size=16) if settings.UPLOAD_DEDUP_ENABLED else None
         
-        # Double-check file size after reading
-        file_size_mb = len(file_content) / (1024 * 1024)
-        if file_size_mb > settings.MAX_FILE_SIZE_MB:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File '{file.filename}' is {file_size_mb:.1f}MB, which exceeds the maximum allowed size of {settings.MAX_FILE_SIZE_MB}MB."
+        if background:
+            # The upload is closed once the response is sent, so the job works from a saved copy
+            temp_file_path = await _save_upload(file, hasher)
+            
+            if hasher is not None:
+                try:
+                    upload_hash, existing_chunks = await _find_duplicate_upload(hasher, file.filename, metadata_dict)
+                except Exception:
+                    Path(temp_file_path).unlink(missing_ok=True)
+                    raise
+                if existing_chunks is not None:
+                    # Nothing to process; the job is reported as already completed
+                    Path(temp_file_path).unlink(missing_ok=True)
+                    job_id = ingest_jobs.create(file.filename)
+                    ingest_jobs.update(job_id, status="completed", chunks=existing_chunks)
+                    return ORJSONResponse(
+                        {"job_id": job_id, "status": "completed", "tags": tag_list or []},
+                        status_code=202
+                    )
+                metadata_dict["upload_hash"] = upload_hash
+            
+            job_id = ingest_jobs.create(file.filename)
+            background_tasks.add_task(
+                _run_ingest_job,
+                job_id,
+                partial(document_processor.process_file, temp_file_path, file.filename, metadata_dict),
+                temp_file_path
+            )
+            return ORJSONResponse(
+                {"job_id": job_id, "status": "queued", "tags": tag_list or []},
+                status_code=202
             )
         
-        # Save file to temporary location
-        temp_file_path = document_processor.save_uploaded_file(file_content, file.filename)
+        temp_file_path = None
         
         try:
-            # Process the document
-            texts, metadatas, ids = await document_processor.process_file(temp_file_path, file.filename)
-            
-            # Check if any chunks were generated
-            if not texts or not ids:
-                raise ValueError(f"Failed to extract content from '{file.filename}'. Expected IDs to be a non-empty list, got {ids}")
-            
-            # Add additional metadata to each chunk
-            for metadata in metadatas:
-                metadata.update(metadata_dict)
-                # Add tags if provided
-                if tag_list:
-                    # Convert tag list to comma-separated string to ensure compatibility with ChromaDB
-                    metadata["tags"] = ",".join(tag_list)
+            # Process and store the document once an ingestion slot is free
+            async with _ingest_slot():
+                # Text uploads up to the inline limit are read straight from the upload,
+                # skipping the copy to a second temporary file
+                inline = (
+                    document_processor.can_process_from_stream(file.filename)
+                    and file.size is not None
+                    and file.size <= _INLINE_UPLOAD_MAX_BYTES
+                )
+                
+                if inline:
+                    if hasher is not None:
+                        await asyncio.to_thread(document_processor.hash_uploaded_file, file.file, hasher)
+                else:
+                    # Stream the upload to a temporary location, stopping past the size limit
+                    temp_file_path = await _save_upload(file, hasher)
+                
+                if hasher is not None:
+                    upload_hash, existing_chunks = await _find_duplicate_upload(hasher, file.filename, metadata_dict)
+                    if existing_chunks is not None:
+                        return ORJSONResponse({
+                            "status": "exists",
+                            "message": f"Document '{file.filename}' was already uploaded with the same content, tags and metadata",
+                            "chunks": existing_chunks,
+                            "tags": tag_list or []
+                        })
+                    # Recorded on every chunk so later re-uploads find this one
+                    metadata_dict["upload_hash"] = upload_hash
+                
+                if inline:
+                    texts, metadatas, ids = await run_with_timeout(
+                        document_processor.process_file_from_stream,
+                        settings.PROCESSING_TIMEOUT_SECONDS,
+                        file.file,
+                        file.filename,
+                        metadata_dict
+                    )
+                else:
+                    # Process the document
+                    texts, metadatas, ids = await document_processor.process_file(temp_file_path, file.filename, metadata_dict)
+                
+                # Check if any chunks were generated
+                if not texts or not ids:
+                    raise ValueError(f"Failed to extract content from '{file.filename}'. Expected IDs to be a non-empty list, got {ids}")
+                
+                # Embed and add to main documents collection, batched with concurrent uploads
+                n_chunks = len(ids)
+                await _add_to_main_collection(texts, metadatas, ids)
             
-            # Add to main documents collection
-            chroma_client.add_document_to_main_collection(
-                documents=texts,
-                metadatas=metadatas,
-                ids=ids
-            )
+            # Release the chunk lists before building the response
+            del texts, metadatas, ids
             
             return {
                 "status": "success",
                 "message": f"Document '{file.filename}' uploaded and processed successfully",
-                "chunks": len(texts),
+                "chunks": n_chunks,
                 "tags": tag_list or []
             }
         finally:
             # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+            if temp_file_path:
+                Path(temp_file_path).unlink(missing_ok=True)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -128,53 +574,74 @@ async def upload_document(
 
 
 @router.post("/text", status_code=201)
-async def add_text(text_input: TextInput):
+async def add_text(
+    text_input: TextInput,
+    background_tasks: BackgroundTasks,
+    background: bool = Query(False, description="Queue the text and return 202 with a job ID")
+):
     """Add text directly to the vector database.
     
+    With background=true the text is processed after the response is
+    sent; poll GET /jobs/{job_id} for the outcome.
+    
     Args:
         text_input: Text content and metadata
+        background_tasks: Tasks run after the response is sent
+        background: Whether to process the text in the background
         
     Returns:
-        Upload status
+        Upload status, or the queued job when processing in the background
     """
     try:
         # In the new system, all documents go to the main collection
         # collection_name parameter is ignored (kept for backward compatibility)
         
-        # Process the text
-        texts, metadatas, ids = document_processor.process_text(
+        # Metadata added to every chunk while it is built
+        base_metadata = dict(text_input.metadata or {})
+        if text_input.tags:
+            # Convert tag list to comma-separated string to ensure compatibility with ChromaDB
+            base_metadata["tags"] = join_tags(text_input.tags)
+        
+        # Process the text in a worker thread
+        process = partial(
+            asyncio.to_thread,
+            document_processor.process_text,
             text=text_input.text,
-            source="direct_input"
+            source="direct_input",
+            base_metadata=base_metadata
         )
         
-        # Check if any chunks were generated
-        if not texts or not ids:
-            raise ValueError(f"Failed to extract content from text input. Expected IDs to be a non-empty list, got {ids}")
-        
-        # Add additional metadata if provided
-        if text_input.metadata:
-            for metadata in metadatas:
-                metadata.update(text_input.metadata)
+        if background:
+            job_id = ingest_jobs.create("direct_input")
+            background_tasks.add_task(_run_ingest_job, job_id, process)
+            return ORJSONResponse(
+                {"job_id": job_id, "status": "queued", "tags": text_input.tags or []},
+                status_code=202
+            )
         
-        # Add tags if provided
-        if text_input.tags:
-            for metadata in metadatas:
-                # Convert tag list to comma-separated string to ensure compatibility with ChromaDB
-                metadata["tags"] = ",".join(text_input.tags)
+        # Process and store the text once an ingestion slot is free
+        async with _ingest_slot():
+            texts, metadatas, ids = await process()
+            
+            # Check if any chunks were generated
+            if not texts or not ids:
+                raise ValueError(f"Failed to extract content from text input. Expected IDs to be a non-empty list, got {ids}")
+            
+            # Embed and add to main documents collection, batched with concurrent uploads
+            n_chunks = len(ids)
+            await _add_to_main_collection(texts, metadatas, ids)
         
-        # Add to main documents collection
-        chroma_client.add_document_to_main_collection(
-            documents=texts,
-            metadatas=metadatas,
-            ids=ids
-        )
+        # Release the chunk lists before building the response
+        del texts, metadatas, ids
         
         return {
             "status": "success",
             "message": "Text added successfully",
-            "chunks": len(texts),
+            "chunks": n_chunks,
             "tags": text_input.tags or []
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -182,29 +649,61 @@ async def add_text(text_input: TextInput):
         )
 
 
+@router.get("/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_ingest_job(job_id: str):
+    """Get the status of a background ingestion job.
+    
+    Args:
+        job_id: Job ID returned by /upload or /text with background=true
+        
+    Returns:
+        Job status
+    """
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job '{job_id}' not found"
+        )
+    return IngestJobResponse.model_construct(**job)
+
+
 @router.get("/{collection_name}/{document_id}", response_model=DocumentResponse)
-async def get_document(collection_name: str, document_id: str):
+async def get_document(collection_name: str, document_id: str, request: Request, response: Response):
     """Get a document by ID.
     
+    Responses carry an ETag; a matching If-None-Match header gets a 304.
+    
     Args:
         collection_name: Name of the collection
         document_id: Document ID
+        request: Incoming request
+        response: Outgoing response, used to set the ETag header
         
     Returns:
         Document data
     """
     try:
-        # Check if collection exists
-        collections = chroma_client.list_collections()
-        if collection_name not in collections:
+        # Serve repeat fetches from the cache without touching ChromaDB
+        with _document_cache_lock:
+            cached = _document_cache.get((collection_name, document_id))
+            generation = _document_cache_generation
+        if cached is not None:
+            etag, document = cached
+            if _etag_matches(request, etag):
+                return Response(status_code=304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+            return document
+        
+        # Get document; a missing collection surfaces from the lookup itself
+        try:
+            result = await asyncio.to_thread(chroma_client.get_document, collection_name, document_id)
+        except CollectionNotFoundError:
             raise HTTPException(
                 status_code=404,
                 detail=f"Collection '{collection_name}' not found"
             )
         
-        # Get document
-        result = chroma_client.get_document(collection_name, document_id)
-        
         # Check if document exists
         if not result or not result.get("ids") or not result.get("documents"):
             raise HTTPException(
@@ -220,21 +719,32 @@ async def get_document(collection_name: str, document_id: str):
         # Convert tags from comma-separated string back to list if present
         tags = metadata.get("tags")
         if tags and isinstance(tags, str):
-            tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
+            tags = list(parse_tags(tags))
         
-        return DocumentResponse(
+        # Values come straight from ChromaDB, so skip re-validating them
+        document = DocumentResponse.model_construct(
             id=doc_id,
             text=text,
-            metadata={
-                "source": metadata.get("source", "unknown"),
-                "chunk": metadata.get("chunk"),
-                "total_chunks": metadata.get("total_chunks"),
-                "page": metadata.get("page"),
-                "tags": tags,
-                "additional_metadata": {k: v for k, v in metadata.items() 
-                                       if k not in ["source", "chunk", "total_chunks", "page", "tags"]}
-            }
+            metadata=DocumentMetadata.model_construct(
+                source=metadata.get("source", "unknown"),
+                chunk=metadata.get("chunk"),
+                total_chunks=metadata.get("total_chunks"),
+                page=metadata.get("page"),
+                tags=tags,
+                additional_metadata=_strip_reserved(metadata)
+            )
         )
+        
+        # Derive the ETag from the response content so it changes with the document
+        etag = f'"{hashlib.blake2b(orjson.dumps(document.model_dump()), digest_size=8).hexdigest()}"'
+        with _document_cache_lock:
+            if _document_cache_generation == generation:
+                _document_cache[(collection_name, document_id)] = (etag, document)
+        
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return document
     except HTTPException:
         raise
     except Exception as e:
@@ -258,7 +768,7 @@ async def delete_document_by_source(
         source = request.source
         
         # Delete all chunks of the document by source from main collection
-        chunks_deleted = chroma_client.delete_documents_by_source_from_main_collection(source)
+        chunks_deleted = await asyncio.to_thread(chroma_client.delete_documents_by_source_from_main_collection, source)
         
         if chunks_deleted == 0:
             raise HTTPException(
@@ -289,7 +799,7 @@ async def delete_document(document_id: str):
     """
     try:
         # Delete document from main collection
-        chroma_client.delete_document_from_main_collection(document_id)
+        await asyncio.to_thread(chroma_client.delete_document_from_main_collection, document_id)
         
         return None
     except HTTPException:
@@ -314,59 +824,52 @@ async def list_all_documents(
         List of all documents
     """
     try:
-        # Get all documents from main collection
-        result = chroma_client.get_collection_documents(
+        # Get all document metadata from main collection; grouping needs no chunk text
+        result = await asyncio.to_thread(
+            chroma_client.get_collection_documents,
             chroma_client.DOCUMENTS_COLLECTION, 
-            limit=limit
+            limit=limit,
+            include=["metadatas"]
         )
         
-        documents = []
+        # Group documents by source file
+        doc_sources = {}
         if result and result.get("ids"):
-            # Group documents by source file
-            doc_sources = {}
+            metadatas = result.get("metadatas") or [{}] * len(result["ids"])
             
-            for i, doc_id in enumerate(result["ids"]):
-                metadata = result["metadatas"][i] if result.get("metadatas") else {}
-                
+            for metadata in metadatas:
                 source = metadata.get("source", "unknown")
                 
                 # Clean up the source if it looks like a temp file path
-                if source.startswith('/') and 'tmp' in source.lower():
+                if _TEMP_PATH_RE.match(source):
                     source = os.path.basename(source)
                 
-                if source not in doc_sources:
-                    # Convert tags from comma-separated string back to list
-                    tags = metadata.get("tags", "")
-                    if tags and isinstance(tags, str):
-                        tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
-                    else:
-                        tags = []
-                    
-                    doc_sources[source] = {
-                        "id": f"doc_{source}",
-                        "source": source,
-                        "total_chunks": metadata.get("total_chunks", 1),
-                        "tags": tags,
-                        "metadata": {k: v for k, v in metadata.items() 
-                                   if k not in ["source", "chunk", "total_chunks", "tags"]}
-                    }
-            
-            # Convert to DocumentResponse format
-            for source_info in doc_sources.values():
-                documents.append(DocumentResponse(
-                    id=source_info["id"],
-                    text=f"Document with {source_info['total_chunks']} chunks",
-                    metadata={
-                        "source": source_info["source"],
-                        "total_chunks": source_info["total_chunks"],
-                        "tags": source_info["tags"],
-                        "additional_metadata": source_info["metadata"]
-                    }
-                ))
-        
-        return DocumentList(
-            documents=documents,
-            total=len(documents)
+                # Only a source's first chunk is used; later chunks cost a single lookup
+                if source in doc_sources:
+                    continue
+                
+                # Convert tags from comma-separated string back to list
+                tags = metadata.get("tags", "")
+                if tags and isinstance(tags, str):
+                    tags = parse_tags(tags)
+                else:
+                    tags = []
+                
+                doc_sources[source] = {
+                    "id": f"doc_{source}",
+                    "source": source,
+                    "total_chunks": metadata.get("total_chunks", 1),
+                    "tags": tags,
+                    "metadata": _strip_reserved(metadata, _SOURCE_META_KEYS)
+                }
+        
+        # Stream the DocumentList JSON row by row instead of building it in memory
+        return StreamingResponse(
+            _stream_document_list(
+                _document_row(source_info, f"Document with {source_info['total_chunks']} chunks")
+                for source_info in doc_sources.values()
+            ),
+            media_type="application/json"
         )
     except Exception as e:
         raise HTTPException(
@@ -392,66 +895,72 @@ async def list_all_documents_from_all_collections(
     """
     try:
         all_documents = []
-        all_collections = chroma_client.list_collections()
+        all_collections = sorted(await collection_cache.snapshot_async())
         
-        for collection_name in all_collections:
-            try:
-                result = chroma_client.get_collection_documents(
+        # Scan collections concurrently in worker threads, a few at a time
+        semaphore = asyncio.Semaphore(_COLLECTION_SCAN_CONCURRENCY)
+        
+        async def scan(collection_name: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    chroma_client.get_collection_documents,
                     collection_name, 
-                    limit=limit
+                    limit=limit,
+                    include=["metadatas"]
                 )
+        
+        scans = await asyncio.gather(*(scan(name) for name in all_collections), return_exceptions=True)
+        
+        for collection_name, result in zip(all_collections, scans):
+            try:
+                if isinstance(result, Exception):
+                    raise result
                 
                 if result and result.get("ids"):
                     # Group documents by source file within this collection
                     doc_sources = {}
                     
-                    for i, doc_id in enumerate(result["ids"]):
-                        metadata = result["metadatas"][i] if result.get("metadatas") else {}
-                        
+                    metadatas = result.get("metadatas") or [{}] * len(result["ids"])
+                    
+                    for metadata in metadatas:
                         source = metadata.get("source", "unknown")
                         
                         # Clean up the source if it looks like a temp file path
-                        if source.startswith('/') and 'tmp' in source.lower():
+                        if _TEMP_PATH_RE.match(source):
                             source = os.path.basename(source)
                         
-                        if source not in doc_sources:
-                            # Convert tags from comma-separated string back to list
-                            tags = metadata.get("tags", "")
-                            if tags and isinstance(tags, str):
-                                tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
-                            else:
-                                tags = []
-                            
-                            doc_sources[source] = {
-                                "id": f"{collection_name}_{source}",
-                                "source": source,
-                                "collection": collection_name,
-                                "total_chunks": metadata.get("total_chunks", 1),
-                                "tags": tags,
-                                "metadata": {k: v for k, v in metadata.items() 
-                                           if k not in ["source", "chunk", "total_chunks", "tags"]}
-                            }
+                        # Only a source's first chunk is used; later chunks cost a single lookup
+                        if source in doc_sources:
+                            continue
+                        
+                        # Convert tags from comma-separated string back to list
+                        tags = metadata.get("tags", "")
+                        if tags and isinstance(tags, str):
+                            tags = parse_tags(tags)
+                        else:
+                            tags = []
+                        
+                        doc_sources[source] = {
+                            "id": f"{collection_name}_{source}",
+                            "source": source,
+                            "collection": collection_name,
+                            "total_chunks": metadata.get("total_chunks", 1),
+                            "tags": tags,
+                            "metadata": _strip_reserved(metadata, _SOURCE_META_KEYS)
+                        }
                     
-                    # Convert to DocumentResponse format
-                    for source_info in doc_sources.values():
-                        all_documents.append(DocumentResponse(
-                            id=source_info["id"],
-                            text=f"Document in {source_info['collection']} with {source_info['total_chunks']} chunks",
-                            metadata={
-                                "source": source_info["source"],
-                                "collection": source_info["collection"],  # Show which collection it came from
-                                "total_chunks": source_info["total_chunks"],
-                                "tags": source_info["tags"],
-                                "additional_metadata": source_info["metadata"]
-                            }
-                        ))
+                    all_documents.extend(doc_sources.values())
             except Exception as e:
                 print(f"Error processing collection {collection_name}: {e}")
                 continue
         
-        return DocumentList(
-            documents=all_documents,
-            total=len(all_documents)
+        # Stream the DocumentList JSON row by row instead of building it in memory
+        return StreamingResponse(
+            _stream_document_list(
+                _document_row(source_info, f"Document in {source_info['collection']} with {source_info['total_chunks']} chunks")
+                for source_info in all_documents
+            ),
+            media_type="application/json"
         )
     except Exception as e:
         raise HTTPException(
@@ -464,7 +973,7 @@ async def list_all_documents_from_all_collections(
 async def debug_collection(collection_name: str):
     """Debug endpoint to check raw ChromaDB data."""
     try:
-        result = chroma_client.get_collection_documents(collection_name, limit=5)
+        result = await asyncio.to_thread(chroma_client.get_collection_documents, collection_name, limit=5, create=False)
         return {
             "raw_data": result,
             "collection": collection_name
@@ -497,15 +1006,11 @@ async def search_documents(
             )
         
         query = q.strip()
-        results = []
         
-        # Get all documents from main collection
-        all_docs = chroma_client.get_collection_documents(
-            chroma_client.DOCUMENTS_COLLECTION, 
-            limit=None  # Get all documents for comprehensive search
-        )
+        # Per-source summary of the main collection, cached until documents change
+        search_index = await _get_search_index()
         
-        if not all_docs or not all_docs.get("ids"):
+        if not search_index:
             return {
                 "query": query,
                 "results": [],
@@ -513,125 +1018,118 @@ async def search_documents(
             }
         
         # Group documents by source for better results
+        tag_filter = set(tags) if tags else None
         documents_by_source = {}
-        for i, doc_id in enumerate(all_docs["ids"]):
-            metadata = all_docs["metadatas"][i] if all_docs.get("metadatas") else {}
-            document_text = all_docs["documents"][i] if all_docs.get("documents") else ""
+        for entry in search_index:
+            tag_groups = entry["tag_groups"]
             
-            source = metadata.get("source", "unknown")
-            
-            # Apply tag filtering if specified
-            if tags:
-                doc_tags_str = metadata.get("tags", "")
-                doc_tags = [tag.strip() for tag in doc_tags_str.split(",") if tag.strip()] if doc_tags_str else []
-                # Skip if document doesn't have any of the required tags
-                if not any(tag in doc_tags for tag in tags):
+            # Apply tag filtering if specified, keeping only chunks with any of the required tags
+            if tag_filter:
+                groups = [
+                    group for doc_tags_str, group in tag_groups.items()
+                    if doc_tags_str and not parse_tag_set(doc_tags_str).isdisjoint(tag_filter)
+                ]
+                if not groups:
                     continue
+            else:
+                groups = list(tag_groups.values())
             
-            if source not in documents_by_source:
-                documents_by_source[source] = {
-                    "source": source,
-                    "chunks": [],
-                    "metadata": metadata,
-                    "tags": [tag.strip() for tag in metadata.get("tags", "").split(",") if tag.strip()] if metadata.get("tags") else []
-                }
-            
-            documents_by_source[source]["chunks"].append({
-                "id": doc_id,
-                "text": document_text,
-                "chunk": metadata.get("chunk", 0)
-            })
+            metadata = groups[0][0]
+            documents_by_source[entry["source"]] = {
+                "source": entry["source"],
+                "source_lower": entry["source_lower"],
+                "chunk_count": sum(group[1] for group in groups),
+                "metadata": public_metadata(metadata),
+                "tags": list(parse_tags(metadata["tags"])) if metadata.get("tags") else []
+            }
+        
+        # Best match per source across both filename and content searches
+        best_matches = {}
         
         # Perform both filename and content searches
         # Name-based search (fast string matching)
         query_lower = query.lower()
         for source, doc_info in documents_by_source.items():
-            if query_lower in source.lower():
+            source_lower = doc_info["source_lower"]
+            if query_lower in source_lower:
                 # Calculate relevance score based on how well the query matches
-                if source.lower() == query_lower:
+                if source_lower == query_lower:
                     score = 1.0  # Exact match
-                elif source.lower().startswith(query_lower):
+                elif source_lower.startswith(query_lower):
                     score = 0.9  # Starts with query
                 else:
                     score = 0.7  # Contains query
                 
-                results.append({
+                best_matches[source] = {
                     "source": source,
                     "match_type": "filename",
                     "score": score,
-                    "total_chunks": len(doc_info["chunks"]),
+                    "total_chunks": doc_info["chunk_count"],
                     "tags": doc_info["tags"],
                     "metadata": doc_info["metadata"],
                     "preview": f"Filename match: {source}",
                     "matched_chunk": None
-                })
+                }
         
         # Content-based semantic search
         try:
-            semantic_results = chroma_client.query_collection(
+            semantic_results = await asyncio.to_thread(
+                chroma_client.query_collection,
                 collection_name=chroma_client.DOCUMENTS_COLLECTION,
                 query_text=query,
                 n_results=min(limit * 2, 50)  # Get more results for better filtering
             )
             
             if semantic_results and semantic_results.get("ids") and semantic_results.get("ids")[0]:
-                # Group semantic results by source
-                source_best_matches = {}
+                # Unpack the single query row once instead of indexing per result
+                ids = semantic_results["ids"][0]
+                texts = semantic_results["documents"][0] if semantic_results.get("documents") else [""] * len(ids)
+                metadatas = semantic_results["metadatas"][0] if semantic_results.get("metadatas") else [{}] * len(ids)
+                distances = semantic_results["distances"][0] if semantic_results.get("distances") else [0] * len(ids)
                 
-                for i, doc_id in enumerate(semantic_results["ids"][0]):
-                    metadata = semantic_results["metadatas"][0][i] if semantic_results.get("metadatas") else {}
-                    document_text = semantic_results["documents"][0][i] if semantic_results.get("documents") else ""
-                    distance = semantic_results["distances"][0][i] if semantic_results.get("distances") else 0
-                    
+                for doc_id, document_text, metadata, distance in zip(ids, texts, metadatas, distances):
                     source = metadata.get("source", "unknown")
                     
                     # Apply tag filtering
                     if tags:
                         doc_tags_str = metadata.get("tags", "")
-                        doc_tags = [tag.strip() for tag in doc_tags_str.split(",") if tag.strip()] if doc_tags_str else []
-                        if not any(tag in doc_tags for tag in tags):
+                        if not doc_tags_str or parse_tag_set(doc_tags_str).isdisjoint(tags):
                             continue
                     
-                    # Convert distance to similarity score (lower distance = higher similarity)
-                    score = max(0, 1.0 - distance)
+                    # Convert distance to similarity score (lower distance = higher similarity),
+                    # slightly lower priority than exact filename matches
+                    score = max(0, 1.0 - distance) * 0.95
                     
                     # Only keep the best match per source document
-                    if source not in source_best_matches or score > source_best_matches[source]["score"]:
-                        # Create preview text highlighting the match
-                        preview = document_text[:200] + "..." if len(document_text) > 200 else document_text
-                        
-                        source_best_matches[source] = {
+                    if source not in best_matches or score > best_matches[source]["score"]:
+                        # The preview is filled in once the returned results are known
+                        best_matches[source] = {
                             "source": source,
                             "match_type": "content",
-                            "score": score * 0.95,  # Slightly lower priority than exact filename matches
-                            "total_chunks": len(documents_by_source.get(source, {}).get("chunks", [])),
-                            "tags": [tag.strip() for tag in metadata.get("tags", "").split(",") if tag.strip()] if metadata.get("tags") else [],
-                            "metadata": metadata,
-                            "preview": preview,
+                            "score": score,
+                            "total_chunks": documents_by_source[source]["chunk_count"] if source in documents_by_source else 0,
+                            "tags": list(parse_tags(metadata["tags"])) if metadata.get("tags") else [],
+                            "metadata": public_metadata(metadata),
+                            "preview": None,
                             "matched_chunk": {
                                 "id": doc_id,
                                 "text": document_text,
                                 "chunk": metadata.get("chunk", 0)
                             }
                         }
-                
-                results.extend(source_best_matches.values())
                     
         except Exception as e:
             print(f"Error in semantic search: {e}")
             # Continue with name-only results if semantic search fails
         
-        # Remove duplicates (prioritize higher scores) and sort by relevance
-        unique_results = {}
-        for result in results:
-            source = result["source"]
-            if source not in unique_results or result["score"] > unique_results[source]["score"]:
-                unique_results[source] = result
+        # Keep the most relevant results, ties in the order they were found
+        final_results = heapq.nlargest(limit, best_matches.values(), key=lambda x: x["score"])
         
-        final_results = sorted(unique_results.values(), key=lambda x: x["score"], reverse=True)
-        
-        # Limit results
-        final_results = final_results[:limit]
+        # Create preview text highlighting the match, only for content matches that are returned
+        for result in final_results:
+            if result["preview"] is None:
+                text = result["matched_chunk"]["text"]
+                result["preview"] = text[:_PREVIEW_CHARS] + "..." if len(text) > _PREVIEW_CHARS else text
         
         return {
             "query": query,
@@ -651,97 +1149,134 @@ async def search_documents(
 @router.get("/{collection_name}", response_model=DocumentList)
 async def list_collection_documents(
     collection_name: str,
+    request: Request,
+    response: Response,
     limit: Optional[int] = Query(100, ge=1, le=1000)
 ):
     """List all documents in a collection.
     
+    Responses carry an ETag; a matching If-None-Match header gets a 304.
+    
     Args:
         collection_name: Name of the collection
+        request: Incoming request
+        response: Outgoing response, used to set the ETag header
         limit: Maximum number of documents to return
         
     Returns:
         List of documents in the collection
     """
     try:
-        # Check if collection exists
-        collections = chroma_client.list_collections()
-        if collection_name not in collections:
+        # Serve repeat listings from the cache without touching ChromaDB
+        with _document_cache_lock:
+            cached = _listing_cache.get((collection_name, limit))
+            generation = _document_cache_generation
+        if cached is not None:
+            etag, listing = cached
+            if _etag_matches(request, etag):
+                return Response(status_code=304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+            return listing
+        
+        # Get the document metadata in the collection; grouping needs no chunk text.
+        # A missing collection surfaces from the lookup itself rather than a separate check
+        try:
+            result = await asyncio.to_thread(
+                chroma_client.get_collection_documents,
+                collection_name,
+                limit=limit,
+                include=["metadatas"],
+                create=False
+            )
+        except CollectionNotFoundError:
             raise HTTPException(
                 status_code=404,
                 detail=f"Collection '{collection_name}' not found"
             )
         
-        # Get all documents in the collection
-        result = chroma_client.get_collection_documents(collection_name, limit=limit)
-        
         documents = []
         if result and result.get("ids"):
             # Group documents by source file
             doc_sources = {}
             
-            for i, doc_id in enumerate(result["ids"]):
-                text = result["documents"][i] if result.get("documents") else ""
-                metadata = result["metadatas"][i] if result.get("metadatas") else {}
-                
+            # Source info by the source as stored, so repeat chunks skip the cleanup below
+            raw_sources = {}
+            
+            metadatas = result.get("metadatas") or [{}] * len(result["ids"])
+            
+            for metadata in metadatas:
                 # Try to get the original filename first, fall back to source, then unknown
-                source = (
+                raw_source = (
                     metadata.get("original_filename") or 
                     metadata.get("source") or 
                     "unknown"
                 )
                 
+                # Chunks of a source share their metadata, so later chunks are only counted
+                source_info = raw_sources.get(raw_source)
+                if source_info is not None:
+                    source_info.chunk_count += 1
+                    continue
+                
                 # Clean up the source if it looks like a temp file path
-                if source.startswith('/') and 'tmp' in source.lower():
+                source = raw_source
+                if _TEMP_PATH_RE.match(source):
                     # Extract just the filename part if it's a full path
                     source = os.path.basename(source)
                 
-                chunk_num = metadata.get("chunk", 0)
-                
-                if source not in doc_sources:
-                    doc_sources[source] = {
-                        "id": f"{collection_name}_{source}",
-                        "source": source,
-                        "chunks": [],
-                        "total_chunks": metadata.get("total_chunks", 1),
-                        "tags": [],
-                        "metadata": {}
-                    }
+                # Different temp paths can clean up to the same filename
+                source_info = doc_sources.get(source)
+                if source_info is not None:
+                    source_info.chunk_count += 1
+                    raw_sources[raw_source] = source_info
+                    continue
                 
                 # Convert tags from comma-separated string back to list if present
                 tags = metadata.get("tags")
                 if tags and isinstance(tags, str):
-                    tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
-                    doc_sources[source]["tags"] = tags
-                
-                doc_sources[source]["chunks"].append({
-                    "id": doc_id,
-                    "chunk": chunk_num,
-                    "text": text[:200] + "..." if len(text) > 200 else text  # Preview
-                })
+                    tags = parse_tags(tags)
+                else:
+                    tags = []
                 
-                # Store additional metadata
-                doc_sources[source]["metadata"].update({
-                    k: v for k, v in metadata.items() 
-                    if k not in ["source", "chunk", "total_chunks", "tags"]
-                })
+                source_info = _SourceSummary(
+                    source,
+                    metadata.get("total_chunks", 1),
+                    tags,
+                    _strip_reserved(metadata, _SOURCE_META_KEYS)
+                )
+                doc_sources[source] = source_info
+                raw_sources[raw_source] = source_info
             
-            # Convert to DocumentResponse format
-            for source_info in doc_sources.values():
-                documents.append(DocumentResponse(
-                    id=source_info["id"],
-                    text=f"Document with {len(source_info['chunks'])} chunks",
-                    metadata={
-                        "source": source_info["source"],
-                        "total_chunks": source_info["total_chunks"],
-                        "tags": source_info["tags"],
-                        "additional_metadata": source_info["metadata"]
-                    }
-                ))
-        
-        return DocumentList(
+            # Convert to DocumentResponse format; values were built here, so skip re-validating them
+            documents = [
+                DocumentResponse.model_construct(
+                    id=f"{collection_name}_{source_info.source}",
+                    text=f"Document with {source_info.chunk_count} chunks",
+                    metadata=DocumentMetadata.model_construct(
+                        source=source_info.source,
+                        total_chunks=source_info.total_chunks,
+                        tags=list(source_info.tags),
+                        additional_metadata=source_info.metadata
+                    )
+                )
+                for source_info in doc_sources.values()
+            ]
+        
+        listing = DocumentList.model_construct(
             documents=documents,
             total=len(documents)
         )
+        
+        # Derive the ETag from the listing content so it changes with the collection
+        etag = f'"{hashlib.blake2b(orjson.dumps(listing.model_dump()), digest_size=8).hexdigest()}"'
+        with _document_cache_lock:
+            if _document_cache_generation == generation:
+                _listing_cache[(collection_name, limit)] = (etag, listing)
+        
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return listing
     except HTTPException:
         raise
     except Exception as e:
@@ -762,44 +1297,64 @@ async def query_documents(query: QueryRequest):
         Query results
     """
     try:
-        # Use the new tag-based querying system
-        result = chroma_client.query_by_tags(
+        # Repeated queries are answered without embedding or searching again
+        cache_key = (
+            " ".join(query.query_text.casefold().split()),
+            query.n_results,
+            tuple(sorted(query.tags)) if query.tags else None,
+            query.include_untagged
+        )
+        with _query_cache_lock:
+            cached = _query_cache.get(cache_key)
+            generation = _query_cache_generation
+        if cached is not None:
+            # Echo this request's query text, which may differ in case or spacing
+            return cached.model_copy(update={"query": query.query_text})
+        
+        # Use the new tag-based querying system, embedding and searching in a worker thread
+        result = await asyncio.to_thread(
+            chroma_client.query_by_tags,
             query_text=query.query_text,
             tags=query.tags,
             n_results=query.n_results,
             include_untagged=query.include_untagged
         )
         
-        # Process results
-        query_results = []
+        # Unpack the single query row once instead of indexing per result
+        ids = (result.get("ids") or [[]])[0] if result else []
+        texts = (result.get("documents") or [[]])[0] or [""] * len(ids)
+        metadatas = (result.get("metadatas") or [[]])[0] or [{}] * len(ids)
+        distances = (result.get("distances") or [[]])[0] or [0] * len(ids)
         
-        if result and result.get("ids") and result.get("ids")[0]:
-            for i in range(len(result["ids"][0])):
-                doc_id = result["ids"][0][i]
-                text = result["documents"][0][i] if result.get("documents") and result["documents"][0] else ""
-                metadata = result["metadatas"][0][i] if result.get("metadatas") and result["metadatas"][0] else {}
-                distance = result["distances"][0][i] if result.get("distances") and result["distances"][0] else 0
-                
-                # Convert tags from comma-separated string back to list if present
-                if metadata.get("tags") and isinstance(metadata["tags"], str):
-                    metadata["tags"] = [tag.strip() for tag in metadata["tags"].split(',') if tag.strip()]
-                
-                # Convert distance to similarity score (1 - distance)
-                score = 1 - distance if distance <= 1 else 0
-                
-                query_results.append(
-                    QueryResult(
-                        id=doc_id,
-                        text=text,
-                        metadata=metadata,
-                        score=score
-                    )
-                )
+        # Convert distances to similarity scores (1 - distance), floored at 0, in one array operation
+        scores = np.maximum(0.0, 1.0 - np.asarray(distances, dtype=np.float64)).tolist()
+        
+        # Convert tags from comma-separated string back to list if present
+        metadatas = [public_metadata(metadata) for metadata in metadatas]
+        for metadata in metadatas:
+            if metadata.get("tags") and isinstance(metadata["tags"], str):
+                metadata["tags"] = list(parse_tags(metadata["tags"]))
+        
+        # Values come straight from ChromaDB, so skip re-validating them
+        query_results = [
+            QueryResult.model_construct(
+                id=doc_id,
+                text=text,
+                metadata=metadata,
+                score=score
+            )
+            for doc_id, text, metadata, score in zip(ids, texts, metadatas, scores)
+        ]
         
-        return QueryResponse(
+        response = QueryResponse.model_construct(
             results=query_results,
             query=query.query_text
         )
+        with _query_cache_lock:
+            # Results fetched before a concurrent write must not outlive its invalidation
+            if _query_cache_generation == generation:
+                _query_cache[cache_key] = response
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -818,7 +1373,8 @@ async def update_document_tags(request: UpdateDocumentTagsRequest):
     """
     try:
         # Update document metadata with new tags
-        updated_count = chroma_client.update_document_metadata_by_source(
+        updated_count = await asyncio.to_thread(
+            chroma_client.update_document_metadata_by_source,
             source=request.source,
             new_metadata={"tags": request.tags}
         )
@@ -861,7 +1417,7 @@ async def suggest_tags_for_source(
     """
     try:
         # Get document chunks from the main collection
-        result = chroma_client.get_documents_by_source_from_main_collection(source_filename)
+        result = await asyncio.to_thread(chroma_client.get_documents_by_source_from_main_collection, source_filename)
         
         if not result or not result.get("documents"):
             raise HTTPException(
@@ -873,7 +1429,7 @@ async def suggest_tags_for_source(
         document_texts = result["documents"]
         
         # Get existing tags from the system
-        existing_tags = chroma_client.get_all_tags()
+        existing_tags = await asyncio.to_thread(chroma_client.get_all_tags)
         
         # Generate tag suggestions using LLM
         suggested_tags = await llm_service.suggest_tags(
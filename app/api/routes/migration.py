@@ -2,8 +2,10 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any, Optional
 
 from app.db.chroma_client import chroma_client
+from app.db.collection_cache import collection_cache
+from app.utils.orjson_response import ORJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 @router.post("/migrate-documents")
@@ -40,8 +42,9 @@ async def get_collections_status():
         Collection status information
     """
     try:
-        all_collections = chroma_client.list_collections()
-        main_collection_exists = chroma_client.DOCUMENTS_COLLECTION in all_collections
+        collection_names = await collection_cache.snapshot_async()
+        all_collections = sorted(collection_names)
+        main_collection_exists = chroma_client.DOCUMENTS_COLLECTION in collection_names
         
         # Get document counts for each collection
         collection_info = {}
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Any, Optional
+import asyncio
 
 from app.models.schemas import (
     TagListResponse,
@@ -8,8 +9,11 @@ from app.models.schemas import (
     QueryResult
 )
 from app.db.chroma_client import chroma_client
+from app.utils.orjson_response import ORJSONResponse
+from app.utils.tags import parse_tags
+from app.utils.metadata import public_metadata
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 @router.get("/", response_model=TagListResponse)
@@ -20,8 +24,10 @@ async def get_all_tags():
         List of tags and their usage statistics
     """
     try:
-        tags = chroma_client.get_all_tags()
-        tag_counts = chroma_client.get_tag_counts()
+        tags, tag_counts = await asyncio.gather(
+            asyncio.to_thread(chroma_client.get_all_tags),
+            asyncio.to_thread(chroma_client.get_tag_counts)
+        )
         
         return TagListResponse(
             tags=tags,
@@ -43,7 +49,8 @@ async def query_by_tags(request: TagBasedQueryRequest):
     """
     try:
         # Query documents using the tag-based method
-        results = chroma_client.query_by_tags(
+        results = await asyncio.to_thread(
+            chroma_client.query_by_tags,
             query_text=request.query_text,
             tags=request.tags,
             n_results=request.n_results,
@@ -53,15 +60,25 @@ async def query_by_tags(request: TagBasedQueryRequest):
         # Transform ChromaDB results into our schema format
         query_results = []
         if results and "ids" in results and results["ids"]:
-            for i, doc_id in enumerate(results["ids"][0]):  # ChromaDB returns nested lists
-                query_results.append(QueryResult(
+            # Unpack the single query row once instead of indexing per result (ChromaDB returns nested lists)
+            ids = results["ids"][0]
+            texts = results["documents"][0] if results.get("documents") else [""] * len(ids)
+            metadatas = results["metadatas"][0] if results.get("metadatas") else [{}] * len(ids)
+            # Convert distance to similarity
+            scores = [1.0 - distance for distance in results["distances"][0]] if results.get("distances") else [1.0] * len(ids)
+            
+            # Values come straight from ChromaDB, so skip validation
+            query_results = [
+                QueryResult.model_construct(
                     id=doc_id,
-                    text=results["documents"][0][i] if results["documents"] else "",
-                    metadata=results["metadatas"][0][i] if results["metadatas"] else {},
-                    score=1.0 - results["distances"][0][i] if results["distances"] else 1.0  # Convert distance to similarity
-                ))
+                    text=text,
+                    metadata=public_metadata(metadata),
+                    score=score
+                )
+                for doc_id, text, metadata, score in zip(ids, texts, metadatas, scores)
+            ]
         
-        return QueryResponse(
+        return QueryResponse.model_construct(
             results=query_results,
             query=request.query_text
         )
@@ -86,7 +103,8 @@ async def get_documents_by_tags(
         Filtered documents
     """
     try:
-        result = chroma_client.get_documents_by_tags(
+        result = await asyncio.to_thread(
+            chroma_client.get_documents_by_tags,
             tags=tags,
             include_untagged=include_untagged,
             limit=limit
@@ -110,13 +128,13 @@ async def get_documents_by_tags(
                     
                     # Extract tags from metadata
                     tags_str = metadata.get("tags", "")
-                    doc_tags = [tag.strip() for tag in tags_str.split(",") if tag.strip()] if tags_str else []
+                    doc_tags = list(parse_tags(tags_str)) if tags_str else []
                     
                     documents.append({
                         "source": source,
                         "total_chunks": len(source_chunks),
                         "tags": doc_tags,
-                        "metadata": metadata
+                        "metadata": public_metadata(metadata)
                     })
         
         return {
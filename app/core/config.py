@@ -30,6 +30,11 @@ class Settings(BaseSettings):
         description="Directory where ChromaDB will persist data"
     )
     
+    COLLECTION_CACHE_TTL_SECONDS: float = Field(
+        default=2.0,
+        description="How long the list of ChromaDB collections is cached in memory"
+    )
+    
     # LLM provider settings
     DEFAULT_LLM_PROVIDER: LLMProvider = Field(
         default=LLMProvider(os.getenv("DEFAULT_LLM_PROVIDER", "ollama")),
@@ -86,6 +91,128 @@ class Settings(BaseSettings):
         description="Default LLM model to use (legacy, use provider-specific settings instead)"
     )
     
+    # Embedding cache settings
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(
+        default=10000,
+        description="Maximum number of query embeddings held in the embedding cache"
+    )
+    
+    # Query cache settings
+    QUERY_CACHE_MAX_ENTRIES: int = Field(
+        default=2048,
+        description="Maximum number of document query results held in the query cache"
+    )
+    QUERY_CACHE_TTL_SECONDS: float = Field(
+        default=300,
+        description="Seconds after which cached document query results expire"
+    )
+    
+    # Document cache settings
+    DOCUMENT_CACHE_MAX_ENTRIES: int = Field(
+        default=1024,
+        description="Maximum number of single-document responses (and, separately, collection listings) held in the document cache"
+    )
+    DOCUMENT_CACHE_TTL_SECONDS: float = Field(
+        default=300,
+        description="Seconds after which cached single-document responses and collection listings expire"
+    )
+    
+    # Response cache settings
+    RESPONSE_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Serve repeated chat queries with identical recent history from an exact-match cache"
+    )
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(
+        default=1024,
+        description="Maximum number of responses held in the exact-match response cache"
+    )
+    RESPONSE_CACHE_TTL_SECONDS: int = Field(
+        default=3600,
+        description="Time in seconds after which exactly cached responses expire"
+    )
+    
+    # Semantic cache settings
+    SEMANTIC_CACHE_ENABLED: bool = Field(
+        default=False,
+        description="Serve first-turn chat queries from a cache of semantically similar earlier queries (trades exact answers for speed)"
+    )
+    SEMANTIC_CACHE_THRESHOLD: float = Field(
+        default=0.05,
+        description="Maximum cosine distance between queries for a semantic cache hit"
+    )
+    SEMANTIC_CACHE_MAX_ENTRIES: int = Field(
+        default=512,
+        description="Maximum number of responses held in the semantic cache"
+    )
+    SEMANTIC_CACHE_TTL_SECONDS: int = Field(
+        default=3600,
+        description="Time in seconds after which semantically cached responses expire"
+    )
+    
+    # Title cache settings
+    TITLE_CACHE_MAX_ENTRIES: int = Field(
+        default=1024,
+        description="Maximum number of generated conversation titles to cache"
+    )
+    TITLE_CACHE_TTL_SECONDS: int = Field(
+        default=86400,
+        description="Time in seconds after which cached conversation titles expire"
+    )
+    
+    # Retrieval grouping settings
+    QUERY_GROUPING_ENABLED: bool = Field(
+        default=True,
+        description="Coalesce concurrent chat retrievals into batched vector queries"
+    )
+    QUERY_GROUP_WINDOW_MS: float = Field(
+        default=10.0,
+        description="How long in milliseconds to wait for concurrent retrievals to join a batch"
+    )
+    QUERY_GROUP_MAX_BATCH: int = Field(
+        default=32,
+        description="Maximum number of retrievals issued in a single batched vector query"
+    )
+    
+    # Write batching settings
+    WRITE_BATCHING_ENABLED: bool = Field(
+        default=True,
+        description="Coalesce concurrent document inserts into batched ChromaDB adds"
+    )
+    WRITE_BATCH_WINDOW_MS: float = Field(
+        default=20.0,
+        description="How long in milliseconds to wait for concurrent inserts to join a batch"
+    )
+    WRITE_BATCH_MAX_CHUNKS: int = Field(
+        default=250,
+        description="Chunk count after which no more inserts join a batched add"
+    )
+    
+    # Ingestion concurrency settings
+    MAX_CONCURRENT_INGESTS: int = Field(
+        default=4,
+        description="Maximum number of documents processed and stored at the same time"
+    )
+    MAX_WAITING_INGESTS: int = Field(
+        default=32,
+        description="Number of uploads that may wait for a free ingestion slot before new ones get a 503"
+    )
+    
+    # Upload deduplication settings
+    UPLOAD_DEDUP_ENABLED: bool = Field(
+        default=True,
+        description="Skip uploads whose content, filename, tags and metadata match an already stored upload"
+    )
+    
+    # Background ingestion settings
+    INGEST_JOB_MAX_ENTRIES: int = Field(
+        default=10000,
+        description="Maximum number of background ingestion jobs whose status is kept"
+    )
+    INGEST_JOB_TTL_SECONDS: float = Field(
+        default=3600,
+        description="Seconds for which the status of a background ingestion job can be polled"
+    )
+    
     # Document settings
     CHUNK_SIZE: int = Field(
         default=1000,
@@ -99,10 +226,18 @@ class Settings(BaseSettings):
         default=30,
         description="Maximum file size in MB for document upload"
     )
+    INLINE_UPLOAD_MAX_MB: float = Field(
+        default=8,
+        description="Plain-text uploads up to this size in MB are processed straight from the upload without a temp file"
+    )
     PROCESSING_TIMEOUT_SECONDS: int = Field(
         default=60,
         description="Maximum time in seconds to process a document"
     )
+    ADD_BATCH_SIZE: int = Field(
+        default=128,
+        description="Number of chunks embedded and inserted per batch when adding documents"
+    )
 
     class Config:
         case_sensitive = True
@@ -1,11 +1,19 @@
 import os
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 from chromadb.utils import embedding_functions
 from chromadb.utils.embedding_functions import DefaultEmbeddingFunction, ONNXMiniLM_L6_V2
 
 from app.core.config import settings
+from app.utils.embed_cache import embedding_cache
+from app.utils.tags import parse_tags, parse_tag_set, join_tags
+
+class CollectionNotFoundError(Exception):
+    """Raised when a collection that must already exist does not."""
+    pass
+
 
 class ChromaClient:
     """Client for interacting with ChromaDB vector database."""
@@ -27,6 +35,15 @@ class ChromaClient:
             )
         )
         
+        # Callbacks run whenever a collection is created or deleted
+        self.collection_listeners: List[Callable[[], None]] = []
+        
+        # Callbacks run whenever documents are added, updated or deleted
+        self.document_listeners: List[Callable[[], None]] = []
+        
+        # Collection handles by name, so repeated lookups skip the ChromaDB metadata query
+        self._collections: Dict[str, chromadb.Collection] = {}
+        
         # Try to use the embedding function based on the configured LLM provider
         # Always try ONNX first as it's more stable and avoids CoreML issues
         try:
@@ -91,16 +108,101 @@ class ChromaClient:
         Returns:
             ChromaDB collection
         """
+        collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
+        
         try:
-            return self.client.get_collection(
+            collection = self.client.get_collection(
                 name=collection_name,
                 embedding_function=self.default_ef
             )
         except (ValueError, chromadb.errors.NotFoundError):
-            return self.client.create_collection(
+            collection = self.client.create_collection(
                 name=collection_name,
                 embedding_function=self.default_ef
             )
+            self._notify_collections_changed()
+        
+        self._collections[collection_name] = collection
+        return collection
+    
+    def get_collection(self, collection_name: str) -> chromadb.Collection:
+        """Get an existing collection from ChromaDB without creating it.
+        
+        Args:
+            collection_name: Name of the collection
+            
+        Returns:
+            ChromaDB collection
+            
+        Raises:
+            CollectionNotFoundError: If the collection does not exist
+        """
+        collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
+        
+        try:
+            collection = self.client.get_collection(
+                name=collection_name,
+                embedding_function=self.default_ef
+            )
+        except (ValueError, chromadb.errors.NotFoundError):
+            raise CollectionNotFoundError(f"Collection '{collection_name}' not found")
+        
+        self._collections[collection_name] = collection
+        return collection
+    
+    def _notify_collections_changed(self) -> None:
+        """Run collection listeners after the set of collections changed."""
+        for listener in self.collection_listeners:
+            listener()
+    
+    def _notify_documents_changed(self) -> None:
+        """Run document listeners after documents were added, updated or deleted."""
+        for listener in self.document_listeners:
+            listener()
+    
+    def embed_query(self, query_text: str) -> List[float]:
+        """Embed a query with the collection embedding function.
+        
+        Args:
+            query_text: Query text
+            
+        Returns:
+            Query embedding
+        """
+        return self.embed_queries([query_text])[0]
+    
+    def embed_queries(self, query_texts: List[str]) -> List[List[float]]:
+        """Embed several queries in one call to the collection embedding function.
+        
+        Embeddings of previously seen queries are served from the embedding cache.
+        
+        Args:
+            query_texts: Query texts
+            
+        Returns:
+            Query embeddings in the same order as the texts
+        """
+        embedder = type(self.default_ef).__name__
+        embeddings = embedding_cache.get_many(embedder, query_texts)
+        
+        # Embed only the distinct texts that missed the cache
+        missing = list(dict.fromkeys(text for text, embedding in zip(query_texts, embeddings) if embedding is None))
+        if missing:
+            computed = {
+                text: [float(value) for value in embedding]
+                for text, embedding in zip(missing, self.default_ef(missing))
+            }
+            embedding_cache.put_many(embedder, computed)
+            embeddings = [
+                embedding if embedding is not None else computed[text]
+                for text, embedding in zip(query_texts, embeddings)
+            ]
+        
+        return embeddings
     
     def list_collections(self) -> List[str]:
         """List all collections in ChromaDB.
@@ -116,7 +218,10 @@ class ChromaClient:
         Args:
             collection_name: Name of the collection to delete
         """
+        self._collections.pop(collection_name, None)
         self.client.delete_collection(collection_name)
+        self._notify_collections_changed()
+        self._notify_documents_changed()
     
     def add_documents(
         self,
@@ -127,6 +232,9 @@ class ChromaClient:
     ) -> None:
         """Add documents to a collection.
         
+        Large documents are added in batches, embedding the next batch while
+        the current one is inserted into the index.
+        
         Args:
             collection_name: Name of the collection
             documents: List of document texts
@@ -134,18 +242,55 @@ class ChromaClient:
             ids: Optional list of document IDs
         """
         collection = self.get_or_create_collection(collection_name)
-        collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        batch_size = max(1, min(settings.ADD_BATCH_SIZE, self.client.get_max_batch_size()))
+        
+        if len(documents) <= batch_size:
+            collection.add(
+                documents=documents,
+                metadatas=metadatas,
+                ids=ids
+            )
+        else:
+            batches = [slice(start, start + batch_size) for start in range(0, len(documents), batch_size)]
+            # Chroma skips IDs that already exist, so remember them to keep them out of a rollback
+            existing_ids = set(collection.get(ids=ids, include=[])["ids"]) if ids else set()
+            added = 0
+            try:
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    pending = executor.submit(self.default_ef, documents[batches[0]])
+                    for i, batch in enumerate(batches):
+                        embeddings = pending.result()
+                        if i + 1 < len(batches):
+                            pending = executor.submit(self.default_ef, documents[batches[i + 1]])
+                        
+                        collection.add(
+                            documents=documents[batch],
+                            embeddings=embeddings,
+                            metadatas=metadatas[batch] if metadatas else None,
+                            ids=ids[batch] if ids else None
+                        )
+                        added = batch.stop
+            except Exception:
+                # Remove the chunks this call already stored, so a failed add leaves no
+                # partial document behind and can be retried with the same IDs
+                inserted_ids = [doc_id for doc_id in ids[:added] if doc_id not in existing_ids] if ids else []
+                if inserted_ids:
+                    try:
+                        collection.delete(ids=inserted_ids)
+                    except Exception as e:
+                        print(f"Error removing partially added documents: {e}")
+                        self._notify_documents_changed()
+                raise
+        
+        self._notify_documents_changed()
     
     def query_collection(
         self,
         collection_name: str,
         query_text: str,
         n_results: int = 5,
-        where: Optional[Dict[str, Any]] = None
+        where: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[List[float]] = None
     ) -> Dict[str, Any]:
         """Query a collection for similar documents.
         
@@ -154,13 +299,19 @@ class ChromaClient:
             query_text: Query text
             n_results: Number of results to return
             where: Optional filter criteria
+            query_embedding: Optional precomputed embedding of the query text
             
         Returns:
             Query results
         """
         collection = self.get_or_create_collection(collection_name)
+        
+        # Embed through the cache so repeated queries skip the embedding model
+        if query_embedding is None:
+            query_embedding = self.embed_query(query_text)
+        
         return collection.query(
-            query_texts=[query_text],
+            query_embeddings=[query_embedding],
             n_results=n_results,
             where=where
         )
@@ -178,8 +329,11 @@ class ChromaClient:
             
         Returns:
             Document data
+            
+        Raises:
+            CollectionNotFoundError: If the collection does not exist
         """
-        collection = self.get_or_create_collection(collection_name)
+        collection = self.get_collection(collection_name)
         return collection.get(ids=[document_id])
     
     def delete_document(
@@ -195,6 +349,7 @@ class ChromaClient:
         """
         collection = self.get_or_create_collection(collection_name)
         collection.delete(ids=[document_id])
+        self._notify_documents_changed()
     
     def delete_documents_by_source(
         self,
@@ -212,12 +367,12 @@ class ChromaClient:
         """
         collection = self.get_or_create_collection(collection_name)
         
-        # First try exact match
-        result = collection.get(where={"source": source})
+        # First try exact match, fetching only the IDs to count the chunks
+        result = collection.get(where={"source": source}, include=[])
         
-        # If no exact match, get all documents and find those where source ends with the filename
+        # If no exact match, get all metadata and find chunks where source ends with the filename
         if not result or not result.get("ids"):
-            all_docs = collection.get()
+            all_docs = collection.get(include=["metadatas"])
             if all_docs and all_docs.get("ids"):
                 matching_ids = []
                 for i, doc_id in enumerate(all_docs["ids"]):
@@ -228,10 +383,12 @@ class ChromaClient:
                 
                 if matching_ids:
                     collection.delete(ids=matching_ids)
+                    self._notify_documents_changed()
                     return len(matching_ids)
         else:
-            # Delete all matching documents
-            collection.delete(ids=result["ids"])
+            # Delete all matching documents with the same filter, without sending their IDs back
+            collection.delete(where={"source": source})
+            self._notify_documents_changed()
             return len(result["ids"])
         
         return 0
@@ -239,21 +396,34 @@ class ChromaClient:
     def get_collection_documents(
         self,
         collection_name: str,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        include: Optional[List[str]] = None,
+        create: bool = True
     ) -> Dict[str, Any]:
         """Get all documents in a collection.
         
         Args:
             collection_name: Name of the collection
             limit: Maximum number of documents to return (optional)
+            include: Fields to fetch besides IDs (optional, defaults to documents and metadatas)
+            create: Whether to create the collection if it does not exist
             
         Returns:
             Collection data including documents, metadata, and IDs
+            
+        Raises:
+            CollectionNotFoundError: If the collection does not exist and create is False
         """
-        collection = self.get_or_create_collection(collection_name)
+        if create:
+            collection = self.get_or_create_collection(collection_name)
+        else:
+            collection = self.get_collection(collection_name)
         
-        # Get all documents in the collection
-        result = collection.get(limit=limit)
+        # Get all documents in the collection, skipping fields the caller does not need
+        if include is not None:
+            result = collection.get(limit=limit, include=include)
+        else:
+            result = collection.get(limit=limit)
         
         return result
     
@@ -265,12 +435,28 @@ class ChromaClient:
         """
         return self.get_or_create_collection(self.DOCUMENTS_COLLECTION)
     
+    def get_upload_by_hash(self, upload_hash: str) -> Optional[Dict[str, Any]]:
+        """Find a stored chunk of an upload in the main documents collection by its upload hash.
+        
+        Args:
+            upload_hash: Hash recorded in the upload's chunk metadata
+            
+        Returns:
+            Metadata of one of the upload's chunks, or None if no upload has this hash
+        """
+        collection = self.get_documents_collection()
+        result = collection.get(where={"upload_hash": upload_hash}, limit=1, include=["metadatas"])
+        if not result or not result.get("ids"):
+            return None
+        return result["metadatas"][0] if result.get("metadatas") else {}
+    
     def query_by_tags(
         self,
         query_text: str,
         tags: Optional[List[str]] = None,
         n_results: int = 5,
-        include_untagged: bool = True
+        include_untagged: bool = True,
+        query_embedding: Optional[List[float]] = None
     ) -> Dict[str, Any]:
         """Query documents by tags, including untagged documents.
         
@@ -279,16 +465,22 @@ class ChromaClient:
             tags: List of tags to filter by (None means no tag filtering)
             n_results: Number of results to return
             include_untagged: Whether to include untagged documents
+            query_embedding: Optional precomputed embedding of the query text
             
         Returns:
             Query results combining tagged and untagged documents
         """
         collection = self.get_documents_collection()
         
+        # Reuse the caller's embedding when available, otherwise embed through the cache
+        if query_embedding is None:
+            query_embedding = self.embed_query(query_text)
+        query_args = {"query_embeddings": [query_embedding]}
+        
         # If no tags specified, query all documents
         if not tags:
             return collection.query(
-                query_texts=[query_text],
+                **query_args,
                 n_results=n_results
             )
         
@@ -307,10 +499,46 @@ class ChromaClient:
         # Get all results without where clause filtering, then filter client-side
         # This is more reliable than trying to use complex where clauses
         all_results = collection.query(
-            query_texts=[query_text],
+            **query_args,
             n_results=n_results * 3  # Get more results to filter from
         )
         
+        return self.filter_results_by_tags(all_results, tags, include_untagged, n_results)
+    
+    def query_documents_batch(self, query_embeddings: List[List[float]], n_results: int = 5) -> Dict[str, Any]:
+        """Query the main documents collection with several embeddings at once.
+        
+        Args:
+            query_embeddings: Query embeddings
+            n_results: Number of results to return per query
+            
+        Returns:
+            Query results with one row per embedding
+        """
+        collection = self.get_documents_collection()
+        return collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results
+        )
+    
+    def filter_results_by_tags(
+        self,
+        all_results: Dict[str, Any],
+        tags: List[str],
+        include_untagged: bool,
+        n_results: int
+    ) -> Dict[str, Any]:
+        """Filter single-query results client-side by comma-separated tags.
+        
+        Args:
+            all_results: Query results for a single query
+            tags: List of tags to filter by
+            include_untagged: Whether to include untagged documents
+            n_results: Maximum number of results to keep
+            
+        Returns:
+            Filtered query results in ChromaDB format
+        """
         # Filter results client-side for tag matching
         if tags and all_results and all_results.get("metadatas") and all_results.get("metadatas")[0]:
             filtered_ids = []
@@ -320,10 +548,10 @@ class ChromaClient:
             
             for i, metadata in enumerate(all_results["metadatas"][0]):
                 doc_tags_str = metadata.get("tags", "")
-                doc_tags = [tag.strip() for tag in doc_tags_str.split(",") if tag.strip()] if doc_tags_str else []
+                doc_tags = parse_tag_set(doc_tags_str) if doc_tags_str else frozenset()
                 
                 # Check if any selected tag matches document tags
-                tag_match = any(tag in doc_tags for tag in tags)
+                tag_match = not doc_tags.isdisjoint(tags)
                 
                 # Check if we should include untagged documents
                 is_untagged = not doc_tags
@@ -374,8 +602,7 @@ class ChromaClient:
             tags_str = metadata.get("tags", "")
             if tags_str and isinstance(tags_str, str):
                 # Split comma-separated tags and clean them
-                tags = [tag.strip() for tag in tags_str.split(",") if tag.strip()]
-                all_tags.update(tags)
+                all_tags.update(parse_tags(tags_str))
         
         return sorted(list(all_tags))
     
@@ -407,8 +634,7 @@ class ChromaClient:
         for source, tags_str in documents_by_source.items():
             if tags_str and isinstance(tags_str, str):
                 # Split comma-separated tags and clean them
-                tags = [tag.strip() for tag in tags_str.split(",") if tag.strip()]
-                for tag in tags:
+                for tag in parse_tags(tags_str):
                     tag_counts[tag] = tag_counts.get(tag, 0) + 1
         
         return dict(sorted(tag_counts.items()))
@@ -464,10 +690,10 @@ class ChromaClient:
             
             for i, metadata in enumerate(all_docs["metadatas"]):
                 doc_tags_str = metadata.get("tags", "")
-                doc_tags = [tag.strip() for tag in doc_tags_str.split(",") if tag.strip()] if doc_tags_str else []
+                doc_tags = parse_tag_set(doc_tags_str) if doc_tags_str else frozenset()
                 
                 # Check if any selected tag matches document tags
-                tag_match = any(tag in doc_tags for tag in tags)
+                tag_match = not doc_tags.isdisjoint(tags)
                 
                 # Check if we should include untagged documents
                 is_untagged = not doc_tags
@@ -579,13 +805,17 @@ class ChromaClient:
                 metadata = result["metadatas"][i] if result.get("metadatas") else {}
                 
                 if metadata.get("source") == source:
-                    # Update metadata while preserving other fields
+                    # Update metadata while preserving other fields. The upload hash covers the
+                    # metadata it was stored with, so it no longer matches and is removed;
+                    # update merges metadata, so the key must be set to None to delete it
                     updated_metadata = metadata.copy()
+                    if "upload_hash" in updated_metadata:
+                        updated_metadata["upload_hash"] = None
                     
                     # Convert tags list to comma-separated string for ChromaDB storage
                     for key, value in new_metadata.items():
                         if key == "tags" and isinstance(value, list):
-                            updated_metadata[key] = ",".join(value) if value else ""
+                            updated_metadata[key] = join_tags(value)
                         else:
                             updated_metadata[key] = value
                     
@@ -597,6 +827,7 @@ class ChromaClient:
                     ids=ids_to_update,
                     metadatas=metadatas_to_update
                 )
+                self._notify_documents_changed()
             
             return len(ids_to_update)
             
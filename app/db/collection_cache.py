@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from typing import FrozenSet
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.db.chroma_client import chroma_client
+
+
+class CollectionCache:
+    """Short-lived in-process cache of ChromaDB collection names."""
+    
+    _KEY = "collections"
+    
+    def __init__(self, ttl_seconds: float):
+        """Initialize the collection cache.
+        
+        Args:
+            ttl_seconds: How long a snapshot of collection names stays valid
+        """
+        self._cache = TTLCache(maxsize=1, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+        
+        # Drop the snapshot whenever a collection is created or deleted through the client
+        chroma_client.collection_listeners.append(self.invalidate)
+    
+    def snapshot(self) -> FrozenSet[str]:
+        """Get the cached set of collection names, refreshing it if expired.
+        
+        Returns:
+            Frozen set of collection names
+        """
+        with self._lock:
+            names = self._cache.get(self._KEY)
+            if names is None:
+                names = frozenset(chroma_client.list_collections())
+                self._cache[self._KEY] = names
+            return names
+    
+    async def snapshot_async(self) -> FrozenSet[str]:
+        """Get the cached set of collection names without blocking the event loop.
+        
+        ChromaDB is only called, in a worker thread, when the snapshot has expired.
+        
+        Returns:
+            Frozen set of collection names
+        """
+        with self._lock:
+            names = self._cache.get(self._KEY)
+        if names is not None:
+            return names
+        return await asyncio.to_thread(self.snapshot)
+    
+    async def exists_async(self, collection_name: str) -> bool:
+        """Check whether a collection exists without blocking the event loop.
+        
+        A miss is re-checked against a fresh snapshot, so collections created
+        outside this cache (e.g. by document ingestion) are never reported missing.
+        
+        Args:
+            collection_name: Name of the collection
+            
+        Returns:
+            True if the collection exists, False otherwise
+        """
+        if collection_name in await self.snapshot_async():
+            return True
+        self.invalidate()
+        return collection_name in await self.snapshot_async()
+    
+    def invalidate(self) -> None:
+        """Drop the cached snapshot so the next lookup hits ChromaDB."""
+        with self._lock:
+            self._cache.clear()
+
+
+# Create a singleton instance
+collection_cache = CollectionCache(ttl_seconds=settings.COLLECTION_CACHE_TTL_SECONDS)
@@ -43,6 +43,20 @@ class ConversationStore:
             return obj.isoformat()
         raise TypeError(f"Type {type(obj)} not serializable")
     
+    def _load_messages(self, raw_messages: List[Dict[str, Any]]) -> List[ChatMessage]:
+        """Build ChatMessage objects from stored message dicts.
+        
+        Stored messages were validated before they were written, so they are
+        constructed without running validation again.
+        
+        Args:
+            raw_messages: Message dicts loaded from a conversation file
+            
+        Returns:
+            List of messages
+        """
+        return [ChatMessage.model_construct(**msg) for msg in raw_messages]
+    
     def create_conversation(self, conversation: ConversationCreate) -> ConversationResponse:
         """Create a new conversation.
         
@@ -112,9 +126,7 @@ class ConversationStore:
         updated_at = datetime.fromisoformat(conversation_data["updated_at"])
         
         # Convert messages from dicts to ChatMessage objects
-        messages = [
-            ChatMessage(**msg) for msg in conversation_data["messages"]
-        ]
+        messages = self._load_messages(conversation_data["messages"])
         
         # Return the conversation
         return ConversationResponse(
@@ -129,6 +141,56 @@ class ConversationStore:
             updated_at=updated_at
         )
     
+    def get_messages(self, conversation_id: str) -> Optional[List[ChatMessage]]:
+        """Get only the messages of a conversation.
+        
+        Args:
+            conversation_id: ID of the conversation
+            
+        Returns:
+            List of messages or None if the conversation is not found
+        """
+        conversation_path = self._get_conversation_path(conversation_id)
+        
+        # Check if the conversation file exists
+        if not os.path.exists(conversation_path):
+            return None
+        
+        # Load the conversation data
+        with open(conversation_path, "r") as f:
+            conversation_data = json.load(f)
+        
+        return self._load_messages(conversation_data["messages"])
+    
+    def append_messages(self, conversation_id: str, messages: List[ChatMessage]) -> bool:
+        """Append messages to a conversation without rebuilding the full conversation.
+        
+        Args:
+            conversation_id: ID of the conversation
+            messages: Messages to append
+            
+        Returns:
+            True if the messages were appended, False if the conversation is not found
+        """
+        conversation_path = self._get_conversation_path(conversation_id)
+        
+        # Check if the conversation file exists
+        if not os.path.exists(conversation_path):
+            return False
+        
+        # Load the stored data as-is and only extend the messages
+        with open(conversation_path, "r") as f:
+            conversation_data = json.load(f)
+        
+        conversation_data["messages"].extend(msg.model_dump() for msg in messages)
+        conversation_data["updated_at"] = datetime.now()
+        
+        # Save the updated conversation
+        with open(conversation_path, "w") as f:
+            json.dump(conversation_data, f, default=self._serialize_datetime)
+        
+        return True
+    
     def update_conversation(self, conversation_id: str, update: ConversationUpdate) -> Optional[ConversationResponse]:
         """Update a conversation.
         
@@ -172,7 +234,7 @@ class ConversationStore:
             collection_name=conversation_data.get("collection_name"),  # Backwards compatibility
             title=conversation_data["title"],
             model=conversation_data.get("model"),
-            messages=[ChatMessage(**msg) if isinstance(msg, dict) else msg for msg in conversation_data["messages"]],
+            messages=[ChatMessage.model_construct(**msg) if isinstance(msg, dict) else msg for msg in conversation_data["messages"]],
             tags=conversation_data.get("tags"),  # Support tags field
             include_untagged=conversation_data.get("include_untagged", True),  # Support include_untagged field
             created_at=conversation_data["created_at"],
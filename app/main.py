@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -7,6 +8,8 @@ from fastapi.responses import HTMLResponse
 
 from app.core.config import settings
 from app.api.api import api_router
+from app.utils.orjson_response import ORJSONResponse
+from app.utils.upload_limit import UploadSizeLimitMiddleware
 
 # Create FastAPI app
 app = FastAPI(
@@ -31,9 +34,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (query results, document listings); level 4 keeps CPU cost low
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+
+# Turn away uploads whose Content-Length is over the file size limit before reading the body;
+# the allowance covers the multipart boundaries and the other form fields
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths=[f"{settings.API_V1_STR}/documents/upload"],
+    max_bytes=settings.MAX_FILE_SIZE_MB * 1024 * 1024 + 64 * 1024,
+)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Format errors that escape a route as a JSON 500, like the routes' own handlers
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    print(f"Unhandled error on {request.method} {request.url.path}: {exc}")
+    return ORJSONResponse({"detail": f"Internal server error: {str(exc)}"}, status_code=500)
+
 # Custom docs endpoint
 @app.get("/docs", include_in_schema=False)
 async def custom_swagger_ui_html():
@@ -56,6 +56,15 @@ class UpdateDocumentTagsRequest(BaseModel):
     tags: List[str] = Field(..., description="New tags for the document")
 
 
+class IngestJobResponse(BaseModel):
+    """Schema for the status of a background ingestion job."""
+    job_id: str = Field(..., description="Job ID")
+    status: str = Field(..., description="Job status (queued, processing, completed, failed)")
+    source: str = Field(..., description="Name of the file or input being ingested")
+    chunks: Optional[int] = Field(None, description="Number of chunks stored, once completed")
+    error: Optional[str] = Field(None, description="Error message, if the job failed")
+
+
 class TextInput(BaseModel):
     """Schema for text input."""
     text: str = Field(..., description="Text content to process")
@@ -0,0 +1,77 @@
+import threading
+import uuid
+from typing import Any, Dict, Optional
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+
+
+class IngestJobStore:
+    """In-process record of background ingestion jobs.
+
+    Jobs move from "queued" to "processing" and end as "completed" (with the
+    stored chunk count) or "failed" (with the error). Finished jobs are kept
+    until they expire, which is long enough for clients to poll the result.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """Initialize the job store.
+
+        Args:
+            max_entries: Maximum number of jobs kept
+            ttl_seconds: Time after which jobs are forgotten
+        """
+        self._jobs = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+
+    def create(self, source: str) -> str:
+        """Register a new queued job.
+
+        Args:
+            source: Name of the file or input being ingested
+
+        Returns:
+            ID of the new job
+        """
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "source": source,
+                "chunks": None,
+                "error": None
+            }
+        return job_id
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Update a job's fields, e.g. its status, chunk count or error.
+
+        Args:
+            job_id: Job ID
+            **fields: Fields to set
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs[job_id] = {**job, **fields}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's current state.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job data or None if the job is unknown or expired
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+# Create a singleton instance
+ingest_jobs = IngestJobStore(
+    max_entries=settings.INGEST_JOB_MAX_ENTRIES,
+    ttl_seconds=settings.INGEST_JOB_TTL_SECONDS
+)
@@ -1,5 +1,7 @@
 from typing import List, Dict, Any, Optional, Callable, AsyncGenerator, Protocol, Union, Type
 import abc
+import asyncio
+import orjson
 from llama_index.core.callbacks import CallbackManager
 from llama_index.core.llms import LLM
 from llama_index.core.prompts import PromptTemplate
@@ -26,6 +28,10 @@ except ImportError:
 from app.core.config import settings, LLMProvider
 from app.db.chroma_client import chroma_client
 from app.models.schemas import ChatMessage
+from app.services.query_grouper import query_grouper
+from app.services.response_cache import response_cache
+from app.services.semantic_cache import semantic_cache
+from app.utils.metadata import public_metadata
 
 # - Always cite your sources with specific references (document names, sections, page numbers when available)
 
@@ -68,18 +74,62 @@ Question: {query}
 Answer:"""
 
 class StreamingCallbackHandler:
-    """Callback handler for streaming LLM responses."""
+    """Callback handler for streaming LLM responses.
     
-    def __init__(self, websocket):
-        """Initialize with WebSocket connection."""
+    Tokens are buffered and sent as a single frame once enough have
+    accumulated, or at the latest `max_delay` seconds after the first
+    buffered token, even if the LLM stalls in between.
+    """
+    
+    def __init__(self, websocket, max_tokens: int = 32, max_delay: float = 0.015):
+        """Initialize with WebSocket connection.
+        
+        Args:
+            websocket: WebSocket connection
+            max_tokens: Number of buffered tokens that triggers a flush
+            max_delay: Seconds a buffered token may wait before it is sent
+        """
         self.websocket = websocket
+        self.max_tokens = max_tokens
+        self.max_delay = max_delay
+        self._buffer: List[str] = []
+        self._flush_timer: Optional[asyncio.Task] = None
+        # Serializes flushes from tokens and the timer so frames keep their order
+        self._flush_lock = asyncio.Lock()
     
     async def on_token(self, token: str, **kwargs) -> None:
-        """Send new token to client via WebSocket."""
-        await self.websocket.send_json({
-            "type": "token",
-            "content": token
-        })
+        """Buffer a new token and send the buffer if enough tokens are waiting."""
+        self._buffer.append(token)
+        if len(self._buffer) >= self.max_tokens:
+            await self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().create_task(self._flush_later())
+    
+    async def _flush_later(self) -> None:
+        """Flush the buffer once the maximum delay has passed."""
+        await asyncio.sleep(self.max_delay)
+        # Cleared before flushing so flush() never cancels the timer that is running it
+        self._flush_timer = None
+        try:
+            await self.flush()
+        except Exception:
+            # A failed send surfaces again on the next token or the final flush
+            pass
+    
+    async def flush(self) -> None:
+        """Send all buffered tokens to the client via WebSocket."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            content = "".join(self._buffer)
+            self._buffer.clear()
+            await self.websocket.send_text(orjson.dumps({
+                "type": "token",
+                "content": content
+            }).decode())
 
 
 class LLMProviderBase(abc.ABC):
@@ -326,6 +376,38 @@ class LLMService:
                 # If no other providers are available, re-raise the error
                 raise
     
+    async def _cached_rag_response(
+        self,
+        query: str,
+        cached: Dict[str, Any],
+        history: Optional[List[ChatMessage]] = None,
+        callback_handler: Optional[StreamingCallbackHandler] = None
+    ) -> Dict[str, Any]:
+        """Build RAG response data from a cached answer.
+        
+        Args:
+            query: User query
+            cached: Cached answer and sources
+            history: Optional chat history
+            callback_handler: Callback handler to stream the cached answer to
+            
+        Returns:
+            Response data with answer, sources and updated history
+        """
+        if callback_handler:
+            await callback_handler.on_token(cached["answer"])
+            await callback_handler.flush()
+        
+        updated_history = history.copy() if history else []
+        updated_history.append(ChatMessage(role="user", content=query))
+        updated_history.append(ChatMessage(role="assistant", content=cached["answer"]))
+        
+        return {
+            "answer": cached["answer"],
+            "sources": cached["sources"],
+            "history": updated_history
+        }
+    
     async def generate_rag_response(
         self,
         query: str,
@@ -350,11 +432,37 @@ class LLMService:
         Returns:
             Response data with answer and sources
         """
+        # Retrieval settings a cached response must match
+        cache_scope = ("collection", collection_name, model, n_results)
+        stream_handler = callback_handler if streaming else None
+        
+        # Serve exact repeats of the query and history from the response cache
+        response_key = None
+        if settings.RESPONSE_CACHE_ENABLED:
+            response_generation = response_cache.generation()
+            response_key = response_cache.make_key(cache_scope, query, history)
+            cached = response_cache.get(response_key)
+            if cached is not None:
+                return await self._cached_rag_response(query, cached, history, stream_handler)
+        
+        # Serve first-turn queries from the semantic cache when a similar query was already answered
+        query_embedding = None
+        cache_partition = None
+        if settings.SEMANTIC_CACHE_ENABLED and not history:
+            semantic_generation = semantic_cache.generation()
+            # Embed in a worker thread so the embedding model never blocks the event loop
+            query_embedding = await asyncio.to_thread(chroma_client.embed_query, query)
+            cache_partition = cache_scope
+            cached = semantic_cache.lookup(query_embedding, cache_partition)
+            if cached is not None:
+                return await self._cached_rag_response(query, cached, history, stream_handler)
+        
         # Query vector database for relevant documents
         results = chroma_client.query_collection(
             collection_name=collection_name,
             query_text=query,
-            n_results=n_results
+            n_results=n_results,
+            query_embedding=query_embedding
         )
         
         # Extract context from results
@@ -380,15 +488,15 @@ class LLMService:
                     sources.append({
                         "id": doc_id,
                         "text": text[:100] + "..." if len(text) > 100 else text,
-                        "metadata": metadata,
+                        "metadata": public_metadata(metadata),
                         "display_name": f"{doc_name}{page_info}"
                     })
         
         # Combine context texts
         context = "\n\n".join(context_texts) if context_texts else "No relevant information found."
         
-        # Get LLM
-        llm = self.get_llm(model=model, streaming=streaming, callback_handler=callback_handler)
+        # Get LLM (tokens are forwarded to the callback handler below, not via llama-index callbacks)
+        llm = self.get_llm(model=model, streaming=streaming)
         
         # Create prompt
         prompt = PromptTemplate(template=RAG_SYSTEM_PROMPT)
@@ -416,6 +524,10 @@ class LLMService:
             response_text = ""
             async for token in await llm.astream_complete(formatted_prompt):
                 response_text += token.delta
+                if callback_handler and token.delta:
+                    await callback_handler.on_token(token.delta)
+            if callback_handler:
+                await callback_handler.flush()
             response = response_text
         else:
             # For non-streaming, we can just get the complete response
@@ -431,6 +543,11 @@ class LLMService:
         updated_history.append(ChatMessage(role="user", content=query))
         updated_history.append(ChatMessage(role="assistant", content=response))
         
+        if response_key is not None:
+            response_cache.set(response_key, {"answer": response, "sources": sources}, response_generation)
+        if cache_partition is not None:
+            semantic_cache.insert(query_embedding, cache_partition, {"answer": response, "sources": sources}, semantic_generation)
+        
         return {
             "answer": response,
             "sources": sources,
@@ -463,13 +580,49 @@ class LLMService:
         Returns:
             Response data with answer and sources
         """
+        # Retrieval settings a cached response must match
+        cache_scope = ("tags", tuple(sorted(tags)) if tags else None, include_untagged, model, n_results)
+        stream_handler = callback_handler if streaming else None
+        
+        # Serve exact repeats of the query and history from the response cache
+        response_key = None
+        if settings.RESPONSE_CACHE_ENABLED:
+            response_generation = response_cache.generation()
+            response_key = response_cache.make_key(cache_scope, query, history)
+            cached = response_cache.get(response_key)
+            if cached is not None:
+                return await self._cached_rag_response(query, cached, history, stream_handler)
+        
+        # Serve first-turn queries from the semantic cache when a similar query was already answered
+        query_embedding = None
+        cache_partition = None
+        if settings.SEMANTIC_CACHE_ENABLED and not history:
+            semantic_generation = semantic_cache.generation()
+            # Embed in a worker thread so the embedding model never blocks the event loop
+            query_embedding = await asyncio.to_thread(chroma_client.embed_query, query)
+            cache_partition = cache_scope
+            cached = semantic_cache.lookup(query_embedding, cache_partition)
+            if cached is not None:
+                return await self._cached_rag_response(query, cached, history, stream_handler)
+        
         # Query vector database using tag-based filtering
-        results = chroma_client.query_by_tags(
-            query_text=query,
-            tags=tags,
-            include_untagged=include_untagged,
-            n_results=n_results
-        )
+        if settings.QUERY_GROUPING_ENABLED:
+            # Batch with retrievals from concurrent chats
+            results = await query_grouper.query_by_tags(
+                query_text=query,
+                tags=tags,
+                include_untagged=include_untagged,
+                n_results=n_results,
+                query_embedding=query_embedding
+            )
+        else:
+            results = chroma_client.query_by_tags(
+                query_text=query,
+                tags=tags,
+                include_untagged=include_untagged,
+                n_results=n_results,
+                query_embedding=query_embedding
+            )
         
         # Extract context from results
         context_texts = []
@@ -494,15 +647,15 @@ class LLMService:
                     sources.append({
                         "id": doc_id,
                         "text": text[:100] + "..." if len(text) > 100 else text,
-                        "metadata": metadata,
+                        "metadata": public_metadata(metadata),
                         "display_name": f"{doc_name}{page_info}"
                     })
         
         # Combine context texts
         context = "\n\n".join(context_texts) if context_texts else "No relevant information found."
         
-        # Get LLM
-        llm = self.get_llm(model=model, streaming=streaming, callback_handler=callback_handler)
+        # Get LLM (tokens are forwarded to the callback handler below, not via llama-index callbacks)
+        llm = self.get_llm(model=model, streaming=streaming)
         
         # Create prompt
         prompt = PromptTemplate(template=RAG_SYSTEM_PROMPT)
@@ -530,6 +683,10 @@ class LLMService:
             response_text = ""
             async for token in await llm.astream_complete(formatted_prompt):
                 response_text += token.delta
+                if callback_handler and token.delta:
+                    await callback_handler.on_token(token.delta)
+            if callback_handler:
+                await callback_handler.flush()
             response = response_text
         else:
             # For non-streaming, we can just get the complete response
@@ -545,6 +702,11 @@ class LLMService:
         updated_history.append(ChatMessage(role="user", content=query))
         updated_history.append(ChatMessage(role="assistant", content=response))
         
+        if response_key is not None:
+            response_cache.set(response_key, {"answer": response, "sources": sources}, response_generation)
+        if cache_partition is not None:
+            semantic_cache.insert(query_embedding, cache_partition, {"answer": response, "sources": sources}, semantic_generation)
+        
         return {
             "answer": response,
             "sources": sources,
@@ -627,4 +789,8 @@ Suggested tags:"""
 
 
 # Create a singleton instance
-llm_service = LLMService()
\ No newline at end of file
+llm_service = LLMService()
+
+# Cached answers and sources are built from the corpus, so drop them whenever documents change
+chroma_client.document_listeners.append(response_cache.clear)
+chroma_client.document_listeners.append(semantic_cache.clear)
@@ -0,0 +1,136 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.chroma_client import chroma_client
+
+# Result fields sliced per query out of a batched ChromaDB response
+_RESULT_KEYS = ("ids", "documents", "metadatas", "distances")
+
+# (query_text, query_embedding, tags, include_untagged, n_results, future)
+PendingQuery = Tuple[str, Optional[List[float]], Optional[List[str]], bool, int, asyncio.Future]
+
+
+class QueryGrouper:
+    """Coalesce concurrent tag-filtered retrievals into batched ChromaDB queries.
+    
+    Retrievals submitted within a short window of each other share one
+    embedding call and one vector query, then are sliced and tag-filtered
+    per request. A lone retrieval falls through to `query_by_tags` unchanged.
+    """
+    
+    def __init__(self, window_ms: float, max_batch: int):
+        """Initialize the query grouper.
+        
+        Args:
+            window_ms: How long to wait for concurrent retrievals to join a batch
+            max_batch: Maximum number of retrievals per batched query
+        """
+        self.window_seconds = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    def _ensure_worker(self) -> None:
+        """Start the batching task on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+    
+    async def query_by_tags(
+        self,
+        query_text: str,
+        tags: Optional[List[str]] = None,
+        n_results: int = 5,
+        include_untagged: bool = True,
+        query_embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """Query documents by tags, batched with any concurrent retrievals.
+        
+        Args:
+            query_text: Query text
+            tags: List of tags to filter by (None means no tag filtering)
+            n_results: Number of results to return
+            include_untagged: Whether to include untagged documents
+            query_embedding: Optional precomputed embedding of the query text
+        
+        Returns:
+            Query results in the same format as `chroma_client.query_by_tags`
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query_text, query_embedding, tags, include_untagged, n_results, future))
+        return await future
+    
+    async def _run(self) -> None:
+        """Collect retrievals for one window at a time and execute them as a batch."""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(self.window_seconds)
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            try:
+                results = await asyncio.to_thread(self._execute, batch)
+            except Exception as e:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (*_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+    
+    def _execute(self, batch: List[PendingQuery]) -> List[Dict[str, Any]]:
+        """Run a batch of retrievals against ChromaDB.
+        
+        Args:
+            batch: Pending retrievals
+        
+        Returns:
+            Query results for each retrieval, in batch order
+        """
+        if len(batch) == 1:
+            query_text, query_embedding, tags, include_untagged, n_results, _ = batch[0]
+            return [chroma_client.query_by_tags(
+                query_text=query_text,
+                tags=tags,
+                include_untagged=include_untagged,
+                n_results=n_results,
+                query_embedding=query_embedding
+            )]
+        
+        # Embed every query that arrived without an embedding in a single call
+        embeddings = [query_embedding for _, query_embedding, *_ in batch]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = chroma_client.embed_queries([batch[i][0] for i in missing])
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+        
+        # Tag-filtered retrievals over-fetch so enough results survive filtering
+        fetch_counts = [n_results * 3 if tags else n_results for _, _, tags, _, n_results, _ in batch]
+        batched = chroma_client.query_documents_batch(embeddings, n_results=max(fetch_counts))
+        
+        results = []
+        for row, (_, _, tags, include_untagged, n_results, _) in enumerate(batch):
+            result = {
+                key: [batched[key][row][:fetch_counts[row]]]
+                for key in _RESULT_KEYS
+                if batched.get(key)
+            }
+            if tags:
+                result = chroma_client.filter_results_by_tags(result, tags, include_untagged, n_results)
+            results.append(result)
+        
+        return results
+
+
+# Create a singleton instance
+query_grouper = QueryGrouper(
+    window_ms=settings.QUERY_GROUP_WINDOW_MS,
+    max_batch=settings.QUERY_GROUP_MAX_BATCH
+)
@@ -0,0 +1,98 @@
+import hashlib
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.models.schemas import ChatMessage
+
+
+class ResponseCache:
+    """Exact-match cache of RAG responses keyed by query and chat history.
+    
+    Unlike the semantic cache this needs no embedding, so repeated questions
+    (including follow-ups in identical conversations) are answered immediately.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """Initialize the response cache.
+        
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl_seconds: Time after which cached responses expire
+        """
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+        self._generation = 0
+    
+    def make_key(self, scope: Hashable, query: str, history: Optional[List[ChatMessage]] = None) -> Tuple[Hashable, str, str]:
+        """Build a cache key from the retrieval scope, query and full history.
+        
+        The whole history is hashed because the prompt includes all of it.
+        
+        Args:
+            scope: Retrieval settings the response depends on (e.g. filters and model)
+            query: User query
+            history: Optional chat history
+        
+        Returns:
+            Cache key
+        """
+        normalized_query = " ".join(query.casefold().split())
+        history_items = [(msg.role, msg.content) for msg in history or []]
+        return (
+            scope,
+            hashlib.blake2b(normalized_query.encode(), digest_size=16).hexdigest(),
+            hashlib.blake2b(orjson.dumps(history_items), digest_size=16).hexdigest()
+        )
+    
+    def get(self, key: Tuple[Hashable, str, str]) -> Optional[Dict[str, Any]]:
+        """Get a cached response.
+        
+        Args:
+            key: Cache key from `make_key`
+        
+        Returns:
+            Cached response data or None on a miss
+        """
+        with self._lock:
+            return self._cache.get(key)
+    
+    def generation(self) -> int:
+        """Get the current cache generation.
+        
+        Capture this before retrieval and pass it to `set`, so a response built
+        from documents that changed in the meantime is not cached.
+        
+        Returns:
+            Generation counter, bumped by every `clear`
+        """
+        with self._lock:
+            return self._generation
+    
+    def set(self, key: Tuple[Hashable, str, str], value: Dict[str, Any], generation: int) -> None:
+        """Cache a response unless the cache was cleared since `generation`.
+        
+        Args:
+            key: Cache key from `make_key`
+            value: Response data to cache
+            generation: Value of `generation()` captured before retrieval
+        """
+        with self._lock:
+            if generation == self._generation:
+                self._cache[key] = value
+    
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+
+# Create a singleton instance
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+)
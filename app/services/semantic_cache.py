@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class SemanticCache:
+    """Approximate cache of RAG responses keyed by query embedding.
+
+    A lookup hits when a cached query in the same partition lies within
+    `threshold` cosine distance of the incoming query. Entries are evicted
+    least-recently-used first and expire after `ttl_seconds`.
+    """
+
+    def __init__(self, max_entries: int, threshold: float, ttl_seconds: float):
+        """Initialize the semantic cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            threshold: Maximum cosine distance for a cache hit
+            ttl_seconds: Time after which cached responses expire
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 vector.
+
+        Args:
+            embedding: Query embedding
+
+        Returns:
+            Normalized embedding
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, embedding: Sequence[float], partition: Hashable) -> Optional[Dict[str, Any]]:
+        """Find a cached response for a semantically similar query.
+
+        Args:
+            embedding: Query embedding
+            partition: Key that cached entries must match exactly (e.g. model and filters)
+
+        Returns:
+            Cached response data or None on a miss
+        """
+        query = self._normalize(embedding)
+        now = time.monotonic()
+
+        with self._lock:
+            entry_ids: List[int] = []
+            vectors: List[np.ndarray] = []
+            for entry_id, entry in list(self._entries.items()):
+                if entry["expires_at"] <= now:
+                    del self._entries[entry_id]
+                elif entry["partition"] == partition:
+                    entry_ids.append(entry_id)
+                    vectors.append(entry["vector"])
+
+            if not entry_ids:
+                return None
+
+            similarities = np.stack(vectors) @ query
+            best = int(np.argmax(similarities))
+            if 1.0 - float(similarities[best]) > self.threshold:
+                return None
+
+            self._entries.move_to_end(entry_ids[best])
+            return self._entries[entry_ids[best]]["value"]
+
+    def generation(self) -> int:
+        """Get the current cache generation.
+
+        Capture this before retrieval and pass it to `insert`, so a response
+        built from documents that changed in the meantime is not cached.
+
+        Returns:
+            Generation counter, bumped by every `clear`
+        """
+        with self._lock:
+            return self._generation
+
+    def insert(self, embedding: Sequence[float], partition: Hashable, value: Dict[str, Any], generation: int) -> None:
+        """Cache a response for a query unless the cache was cleared since `generation`.
+
+        Args:
+            embedding: Query embedding
+            partition: Key that later lookups must match exactly
+            value: Response data to cache
+            generation: Value of `generation()` captured before retrieval
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+
+            self._entries[self._next_id] = {
+                "vector": self._normalize(embedding),
+                "partition": partition,
+                "value": value,
+                "expires_at": time.monotonic() + self.ttl_seconds
+            }
+            self._next_id += 1
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+# Create a singleton instance
+semantic_cache = SemanticCache(
+    max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+    threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+    ttl_seconds=settings.SEMANTIC_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,124 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.chroma_client import chroma_client
+
+# (texts, metadatas, ids, future)
+PendingWrite = Tuple[List[str], List[Dict[str, Any]], List[str], asyncio.Future]
+
+
+class WriteBatcher:
+    """Coalesce concurrent document inserts into batched ChromaDB adds.
+    
+    Inserts submitted within a short window of each other are concatenated
+    and written with one `add` call, so concurrent uploads share a single
+    transaction and index update. Each caller still waits for its own
+    chunks to be stored, so responses keep their current meaning.
+    """
+    
+    def __init__(self, window_ms: float, max_chunks: int):
+        """Initialize the write batcher.
+        
+        Args:
+            window_ms: How long to wait for concurrent inserts to join a batch
+            max_chunks: Maximum number of chunks per batched add
+        """
+        self.window_seconds = window_ms / 1000
+        self.max_chunks = max_chunks
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    def _ensure_worker(self) -> None:
+        """Start the batching task on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+    
+    async def add_documents(
+        self,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str]
+    ) -> None:
+        """Add documents to the main collection, batched with any concurrent inserts.
+        
+        Args:
+            documents: List of document texts
+            metadatas: List of metadata dictionaries
+            ids: List of document IDs
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((documents, metadatas, ids, future))
+        await future
+    
+    async def _run(self) -> None:
+        """Collect inserts for one window at a time and write them as a batch."""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(self.window_seconds)
+            chunk_count = len(batch[0][0])
+            while chunk_count < self.max_chunks and not queue.empty():
+                pending = queue.get_nowait()
+                batch.append(pending)
+                chunk_count += len(pending[0])
+            
+            try:
+                errors = await asyncio.to_thread(self._execute, batch)
+            except Exception as e:
+                errors = [e] * len(batch)
+            
+            for (*_, future), error in zip(batch, errors):
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+    
+    def _execute(self, batch: List[PendingWrite]) -> List[Optional[Exception]]:
+        """Write a batch of inserts to ChromaDB.
+        
+        If the combined add fails, each insert is retried on its own so one
+        bad document (e.g. a duplicate ID) only fails its own request.
+        
+        Args:
+            batch: Pending inserts
+        
+        Returns:
+            None or the raised exception for each insert, in batch order
+        """
+        if len(batch) > 1:
+            try:
+                chroma_client.add_document_to_main_collection(
+                    documents=[text for texts, *_ in batch for text in texts],
+                    metadatas=[metadata for _, metadatas, *_ in batch for metadata in metadatas],
+                    ids=[doc_id for _, _, ids, _ in batch for doc_id in ids]
+                )
+                return [None] * len(batch)
+            except Exception as e:
+                print(f"Batched add of {len(batch)} documents failed, retrying individually: {e}")
+        
+        errors = []
+        for texts, metadatas, ids, _ in batch:
+            try:
+                chroma_client.add_document_to_main_collection(
+                    documents=texts,
+                    metadatas=metadatas,
+                    ids=ids
+                )
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        
+        return errors
+
+
+# Create a singleton instance
+write_batcher = WriteBatcher(
+    window_ms=settings.WRITE_BATCH_WINDOW_MS,
+    max_chunks=settings.WRITE_BATCH_MAX_CHUNKS
+)
@@ -2,9 +2,10 @@ import os
 import uuid
 import signal
 import asyncio
-from typing import List, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, BinaryIO
 import tempfile
-from functools import wraps
+from functools import partial, wraps
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import (
     TextLoader,
@@ -22,34 +23,41 @@ except Exception as e:
     print(f"Warning: Mistral OCR service not available: {e}")
     mistral_ocr_service = None
 
+# Chunk size used when copying uploads to disk
+UPLOAD_COPY_CHUNK_SIZE = 1024 * 1024
+
+# File types whose loaders need a path on disk
+PATH_ONLY_EXTENSIONS = frozenset({".pdf", ".docx", ".doc", ".csv"})
+
+# Shared worker threads for document parsing, so processing never blocks the event loop
+_processing_executor = ThreadPoolExecutor(thread_name_prefix="document-processing")
+
 
 class TimeoutError(Exception):
     """Raised when document processing times out."""
     pass
 
 
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds the maximum allowed size."""
+    pass
+
+
 async def run_with_timeout(func, timeout_seconds: int, *args, **kwargs):
-    """Run a function with a timeout using asyncio.
+    """Run a blocking function in a worker thread with a timeout.
+    
+    The event loop keeps serving other requests while the function runs.
+    On timeout the caller gets control back immediately; the worker thread
+    finishes in the background since threads cannot be interrupted.
     
     This is cross-platform and works on Windows, Mac, and Linux.
     """
-    import concurrent.futures
-    import threading
-    
-    def target():
-        return func(*args, **kwargs)
-    
-    # Use ThreadPoolExecutor to run the function in a separate thread
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future = executor.submit(target)
-        try:
-            # Wait for the result with timeout
-            result = future.result(timeout=timeout_seconds)
-            return result
-        except concurrent.futures.TimeoutError:
-            # Cancel the future (though it may not stop immediately)
-            future.cancel()
-            raise TimeoutError(f"Document processing timed out after {timeout_seconds} seconds")
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_processing_executor, partial(func, *args, **kwargs))
+    try:
+        return await asyncio.wait_for(future, timeout=timeout_seconds)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Document processing timed out after {timeout_seconds} seconds")
 
 
 class DocumentProcessor:
@@ -85,12 +93,13 @@ class DocumentProcessor:
         except OSError as e:
             raise ValueError(f"Could not check file size for '{file_name}': {str(e)}")
     
-    async def _process_pdf_with_ocr(self, file_path: str, file_name: str) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+    async def _process_pdf_with_ocr(self, file_path: str, file_name: str, base_metadata: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
         """Process a PDF using Mistral OCR.
         
         Args:
             file_path: Path to the PDF file
             file_name: Original filename
+            base_metadata: Optional metadata added to every chunk
             
         Returns:
             Tuple of (chunks, metadatas, ids)
@@ -100,20 +109,21 @@ class DocumentProcessor:
             extracted_text = await mistral_ocr_service.extract_text_from_pdf(file_path)
             
             # Process the extracted markdown text
-            return self.process_text(extracted_text, file_name, processing_method="mistral_ocr")
+            return self.process_text(extracted_text, file_name, processing_method="mistral_ocr", base_metadata=base_metadata)
             
         except Exception as e:
             print(f"Mistral OCR failed for {file_name}: {str(e)}")
             print("Falling back to traditional PDF processing...")
             # Fallback to traditional PDF processing
-            return self._process_pdf_traditional(file_path, file_name)
+            return self._process_pdf_traditional(file_path, file_name, base_metadata)
     
-    def _process_pdf_traditional(self, file_path: str, file_name: str) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+    def _process_pdf_traditional(self, file_path: str, file_name: str, base_metadata: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
         """Process a PDF using traditional PyPDFLoader.
         
         Args:
             file_path: Path to the PDF file
             file_name: Original filename
+            base_metadata: Optional metadata added to every chunk
             
         Returns:
             Tuple of (chunks, metadatas, ids)
@@ -145,6 +155,9 @@ class DocumentProcessor:
                         if key not in ['source', 'original_filename', 'processing_method']:
                             metadata[key] = value
                 
+                if base_metadata:
+                    metadata.update(base_metadata)
+                
                 metadatas.append(metadata)
                 # Generate a unique ID for each chunk
                 ids.append(str(uuid.uuid4()))
@@ -155,12 +168,65 @@ class DocumentProcessor:
             print(f"Traditional PDF processing failed for {file_name}: {str(e)}")
             return [], [], []
 
-    def _process_file_sync(self, file_path: str, file_name: str) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+    def can_process_from_stream(self, file_name: str) -> bool:
+        """Check whether a file can be processed from a stream instead of a path.
+        
+        Only plain-text files qualify; PDF, Word and CSV loaders need a file on disk.
+        
+        Args:
+            file_name: Original filename
+            
+        Returns:
+            True if the file can be processed from a stream
+        """
+        return os.path.splitext(file_name)[1].lower() not in PATH_ONLY_EXTENSIONS
+    
+    def process_file_from_stream(self, file_obj: BinaryIO, file_name: str, base_metadata: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+        """Process a plain-text file from a stream and split it into chunks.
+        
+        Produces the same chunks and metadata as processing the file from disk,
+        including the universal-newline translation of the text-mode open.
+        
+        Args:
+            file_obj: Readable binary file object with the file content
+            file_name: Original filename
+            base_metadata: Optional metadata added to every chunk
+            
+        Returns:
+            Tuple of (chunks, metadatas, ids)
+        """
+        try:
+            text = file_obj.read().decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Failed to process '{file_name}': {str(e)}")
+        
+        # Match TextLoader, whose text-mode open turns CRLF and CR line endings into LF
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        
+        chunks = self.text_splitter.split_text(text)
+        
+        metadatas = []
+        ids = []
+        
+        for i, _ in enumerate(chunks):
+            metadatas.append({
+                "source": file_name,
+                "original_filename": file_name,
+                "chunk": i,
+                "total_chunks": len(chunks),
+                **(base_metadata or {}),
+            })
+            ids.append(str(uuid.uuid4()))
+        
+        return chunks, metadatas, ids
+    
+    def _process_file_sync(self, file_path: str, file_name: str, base_metadata: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
         """Process a file and split it into chunks.
         
         Args:
             file_path: Path to the file
             file_name: Original filename
+            base_metadata: Optional metadata added to every chunk
             
         Returns:
             Tuple of (chunks, metadatas, ids)
@@ -172,7 +238,7 @@ class DocumentProcessor:
             if file_extension == '.pdf':
                 # For PDFs, we need to handle OCR asynchronously
                 # This method will be called from the async wrapper
-                return self._process_pdf_traditional(file_path, file_name)
+                return self._process_pdf_traditional(file_path, file_name, base_metadata)
             elif file_extension in ['.docx', '.doc']:
                 loader = Docx2txtLoader(file_path)
             elif file_extension == '.csv':
@@ -208,6 +274,9 @@ class DocumentProcessor:
                             if key not in ['source', 'original_filename']:
                                 metadata[key] = value
                     
+                    if base_metadata:
+                        metadata.update(base_metadata)
+                    
                     metadatas.append(metadata)
                     # Generate a unique ID for each chunk
                     ids.append(str(uuid.uuid4()))
@@ -224,12 +293,13 @@ class DocumentProcessor:
             # Return empty lists to avoid breaking the upload process
             return [], [], []
     
-    async def process_file(self, file_path: str, file_name: str) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+    async def process_file(self, file_path: str, file_name: str, base_metadata: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
         """Process a file and split it into chunks with size and timeout checks.
         
         Args:
             file_path: Path to the file
             file_name: Original filename
+            base_metadata: Optional metadata added to every chunk
             
         Returns:
             Tuple of (chunks, metadatas, ids)
@@ -242,14 +312,15 @@ class DocumentProcessor:
             file_extension = os.path.splitext(file_name)[1].lower()
             if file_extension == '.pdf' and mistral_ocr_service and mistral_ocr_service.is_configured():
                 print(f"Using Mistral OCR for PDF: {file_name}")
-                return await self._process_pdf_with_ocr(file_path, file_name)
+                return await self._process_pdf_with_ocr(file_path, file_name, base_metadata)
             
             # For non-PDFs or when Mistral is not configured, use traditional processing
             return await run_with_timeout(
                 self._process_file_sync,
                 settings.PROCESSING_TIMEOUT_SECONDS,
                 file_path,
-                file_name
+                file_name,
+                base_metadata
             )
             
         except TimeoutError:
@@ -268,13 +339,14 @@ class DocumentProcessor:
             print(f"Traceback: {traceback.format_exc()}")
             raise ValueError(f"Failed to process '{file_name}': {str(e)}")
     
-    def process_text(self, text: str, source: str = "direct_input", processing_method: str = "text_direct") -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+    def process_text(self, text: str, source: str = "direct_input", processing_method: str = "text_direct", base_metadata: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
         """Process raw text and split it into chunks.
         
         Args:
             text: Raw text to process
             source: Source identifier for the text
             processing_method: Method used to process the text
+            base_metadata: Optional metadata added to every chunk
             
         Returns:
             Tuple of (chunks, metadatas, ids)
@@ -293,28 +365,62 @@ class DocumentProcessor:
                 "chunk": i,
                 "total_chunks": len(chunks),
                 "processing_method": processing_method,
+                **(base_metadata or {}),
             }
             metadatas.append(metadata)
             ids.append(str(uuid.uuid4()))
         
         return chunks, metadatas, ids
     
-    def save_uploaded_file(self, file_content: bytes, filename: str) -> str:
+    def hash_uploaded_file(self, file_obj: BinaryIO, hasher: Any) -> None:
+        """Feed an uploaded file's content to a hash, then rewind the file.
+        
+        Args:
+            file_obj: Readable, seekable binary file object with the uploaded content
+            hasher: hashlib object updated with the content
+        """
+        while chunk := file_obj.read(UPLOAD_COPY_CHUNK_SIZE):
+            hasher.update(chunk)
+        file_obj.seek(0)
+    
+    def save_uploaded_file(
+        self,
+        file_obj: BinaryIO,
+        filename: str,
+        max_bytes: Optional[int] = None,
+        hasher: Any = None
+    ) -> str:
         """Save an uploaded file to a temporary location.
         
+        The content is copied in chunks, so the whole upload is never held in memory.
+        
         Args:
-            file_content: File content as bytes
+            file_obj: Readable binary file object with the uploaded content
             filename: Original filename
+            max_bytes: Optional size limit; copying stops as soon as it is exceeded
+            hasher: Optional hashlib object updated with the content as it is copied
             
         Returns:
             Path to the saved file
+            
+        Raises:
+            FileTooLargeError: If the content is larger than max_bytes
         """
         # Create a temporary file
         temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1])
         
         try:
-            # Write the content to the file
-            temp_file.write(file_content)
+            # Stream the content to the file, counting bytes against the limit
+            total = 0
+            while chunk := file_obj.read(UPLOAD_COPY_CHUNK_SIZE):
+                total += len(chunk)
+                if max_bytes is not None and total > max_bytes:
+                    raise FileTooLargeError(
+                        f"File '{filename}' exceeds the maximum allowed size of {max_bytes // (1024 * 1024)}MB."
+                    )
+                if hasher is not None:
+                    hasher.update(chunk)
+                temp_file.write(chunk)
             temp_file.close()
             return temp_file.name
         except Exception as e:
@@ -0,0 +1,61 @@
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from app.core.config import settings
+
+
+class EmbeddingCache:
+    """LRU cache of query embeddings keyed by embedder and text hash."""
+    
+    def __init__(self, max_entries: int):
+        """Initialize the embedding cache.
+        
+        Args:
+            max_entries: Maximum number of cached embeddings
+        """
+        self._cache = LRUCache(maxsize=max_entries)
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def _key(embedder: str, text: str) -> Tuple[str, bytes]:
+        """Build the cache key for a text.
+        
+        Args:
+            embedder: Name of the embedding function
+            text: Text to embed
+        
+        Returns:
+            Cache key
+        """
+        return embedder, hashlib.blake2b(text.encode(), digest_size=16).digest()
+    
+    def get_many(self, embedder: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up cached embeddings for several texts.
+        
+        Args:
+            embedder: Name of the embedding function
+            texts: Texts to look up
+        
+        Returns:
+            Cached embedding or None for each text, in order
+        """
+        with self._lock:
+            return [self._cache.get(self._key(embedder, text)) for text in texts]
+    
+    def put_many(self, embedder: str, embeddings: Dict[str, List[float]]) -> None:
+        """Cache embeddings for several texts.
+        
+        Args:
+            embedder: Name of the embedding function
+            embeddings: Embeddings by text
+        """
+        with self._lock:
+            for text, embedding in embeddings.items():
+                self._cache[self._key(embedder, text)] = embedding
+
+
+# Create a singleton instance
+embedding_cache = EmbeddingCache(max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES)
@@ -0,0 +1,21 @@
+from typing import Any, Dict, FrozenSet
+
+
+# Metadata keys used internally (e.g. for upload deduplication) and never returned to clients
+INTERNAL_META_KEYS: FrozenSet[str] = frozenset({"upload_hash"})
+
+
+def public_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Get chunk metadata without the keys that are only used internally.
+
+    Metadata without internal keys is returned as is rather than copied.
+
+    Args:
+        metadata: Chunk metadata from ChromaDB
+
+    Returns:
+        Metadata safe to return to clients
+    """
+    if INTERNAL_META_KEYS.isdisjoint(metadata):
+        return metadata
+    return {k: v for k, v in metadata.items() if k not in INTERNAL_META_KEYS}
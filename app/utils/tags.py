@@ -0,0 +1,46 @@
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Tuple
+
+
+@lru_cache(maxsize=8192)
+def parse_tags(tags: str) -> Tuple[str, ...]:
+    """Split a comma-separated tag string into its stripped, non-empty tags.
+
+    Chunks of one document share the same tag string, so results are cached
+    and the same tuple is reused across rows.
+
+    Args:
+        tags: Comma-separated tags as stored in ChromaDB metadata
+
+    Returns:
+        Tuple of tags
+    """
+    return tuple(filter(None, map(str.strip, tags.split(','))))
+
+
+@lru_cache(maxsize=8192)
+def parse_tag_set(tags: str) -> FrozenSet[str]:
+    """Parse a comma-separated tag string into a set for membership tests.
+
+    Args:
+        tags: Comma-separated tags as stored in ChromaDB metadata
+
+    Returns:
+        Frozen set of tags
+    """
+    return frozenset(parse_tags(tags))
+
+
+def join_tags(tags: Iterable[str]) -> str:
+    """Join tags into the comma-separated string stored in ChromaDB metadata.
+
+    Tags are stripped and empty ones dropped, so stored strings never carry
+    padding that readers would have to strip again.
+
+    Args:
+        tags: Tags to store
+
+    Returns:
+        Comma-separated tags
+    """
+    return ",".join(filter(None, map(str.strip, tags)))
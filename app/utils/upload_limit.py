@@ -0,0 +1,40 @@
+from typing import Iterable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.utils.orjson_response import ORJSONResponse
+
+
+class UploadSizeLimitMiddleware:
+    """Reject uploads whose declared Content-Length is over the limit.
+
+    The check runs before the multipart body is read, so oversize uploads are
+    turned away without being received. Requests without a Content-Length are
+    passed through and left to the route's own size checks.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Iterable[str], max_bytes: int):
+        """Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            paths: Request paths the limit applies to
+            max_bytes: Largest accepted Content-Length in bytes
+        """
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.paths:
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > self.max_bytes:
+                        response = ORJSONResponse(
+                            {"detail": f"Upload exceeds the maximum allowed size of {self.max_bytes // (1024 * 1024)}MB."},
+                            status_code=413
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
@@ -0,0 +1,25 @@
+from app.core.config import settings
+from app.db.chroma_client import ChromaClient
+
+
+def test_tag_update_clears_upload_hash_so_reupload_is_processed(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIRECTORY", str(tmp_path))
+    client = ChromaClient()
+
+    client.add_document_to_main_collection(
+        documents=["first chunk", "second chunk"],
+        metadatas=[
+            {"source": "notes.txt", "chunk": i, "total_chunks": 2, "tags": "work", "upload_hash": "abc123"}
+            for i in range(2)
+        ],
+        ids=["notes-0", "notes-1"]
+    )
+    assert client.get_upload_by_hash("abc123") is not None
+
+    assert client.update_document_metadata_by_source("notes.txt", {"tags": ["personal"]}) == 2
+
+    # Re-uploading the original file must not match the retagged copy
+    assert client.get_upload_by_hash("abc123") is None
+    stored = client.get_documents_collection().get(ids=["notes-0", "notes-1"], include=["metadatas"])
+    assert all("upload_hash" not in metadata for metadata in stored["metadatas"])
+    assert all(metadata["tags"] == "personal" for metadata in stored["metadatas"])
@@ -0,0 +1,18 @@
+import io
+
+from app.utils.document_processor import document_processor
+
+
+def test_stream_processing_translates_crlf_like_text_loader(tmp_path):
+    content = b"First line\r\nSecond line\rThird line\n" * 200
+    file_path = tmp_path / "notes.txt"
+    file_path.write_bytes(content)
+
+    stream_chunks, stream_metadatas, _ = document_processor.process_file_from_stream(
+        io.BytesIO(content), "notes.txt"
+    )
+    path_chunks, _, _ = document_processor._process_file_sync(str(file_path), "notes.txt")
+
+    assert stream_chunks == path_chunks
+    assert all("\r" not in chunk for chunk in stream_chunks)
+    assert stream_metadatas[0]["total_chunks"] == len(stream_chunks)